@@ -5,18 +5,55 @@ import argparse
 import hashlib
 import json
 import os
+import random
 import shutil
 import subprocess
 import tempfile
 import time
 import urllib.error
 import urllib.request
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 
 LANGS = ["en", "es", "fr", "de", "pt", "ja", "ko", "zh", "ar"]
 
+# Override with ELEVENLABS_API_BASE to point at a local stand-in (e.g. http://127.0.0.1:8765) when testing.
+DEFAULT_ELEVENLABS_API_BASE = "https://api.elevenlabs.io"
+
+# Concurrent TTS requests; ElevenLabs plans cap concurrency, so keep this modest.
+DEFAULT_TTS_JOBS = 4
+
+# Retries for rate limits (429), server errors (5xx) and network failures.
+TTS_MAX_ATTEMPTS = 6
+TTS_BACKOFF_SEC = 1.0
+TTS_MAX_BACKOFF_SEC = 60.0
+
+# Concurrent ffprobe/ffmpeg processes when rendering segments.
+DEFAULT_FFMPEG_JOBS = os.cpu_count() or 4
+
+# Format of every rendered segment (and of the final mix).
+SAMPLE_RATE = 48000
+CHANNELS = 2
+# Bytes per sample: 16-bit PCM, ffmpeg's default codec for .wav output.
+SAMPLE_WIDTH = 2
+
+# Final pilot.mp3 encoding, shared by both assembly modes.
+MP3_ENCODE_ARGS = ["-c:a", "libmp3lame", "-b:a", "64k", "-ar", str(SAMPLE_RATE), "-ac", str(CHANNELS)]
+
+ASSEMBLY_MODES = ("concat", "graph")
+
+# One second of digital silence, sliced/repeated by make_silence_wav.
+_SILENCE_SECOND = bytes(SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH)
+
+# Bump whenever normalize_segment_to_wav's filter chain changes, so cached
+# normalized segments rendered with the old chain are not reused.
+NORMALIZE_FILTER_VERSION = "atempo-apad-atrim-v1"
+
 
 def eprint(msg: str) -> None:
     print(msg, file=os.sys.stderr)
@@ -27,8 +64,8 @@ def fail(msg: str, code: int = 1) -> None:
     raise SystemExit(code)
 
 
-def run(cmd: list[str]) -> None:
-    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+def run(cmd: list[str], cwd: Path | None = None) -> None:
+    cp = subprocess.run(cmd, cwd=str(cwd) if cwd else None, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
     if cp.returncode != 0:
         eprint(cp.stdout)
         eprint(cp.stderr)
@@ -108,8 +145,33 @@ def atempo_chain(factor: float) -> list[float]:
     return parts
 
 
+def elevenlabs_api_base() -> str:
+    return (os.environ.get("ELEVENLABS_API_BASE", "").strip() or DEFAULT_ELEVENLABS_API_BASE).rstrip("/")
+
+
+def _retry_after_sec(e: urllib.error.HTTPError) -> float | None:
+    # Retry-After may be delta-seconds (the common case) or an HTTP date; only the former is honored.
+    try:
+        return max(0.0, float(str(e.headers.get("Retry-After") or "").strip()))
+    except ValueError:
+        return None
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    # Concurrent workers (or an interrupted run) must never leave a truncated cache file behind.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
 def elevenlabs_tts_mp3(api_key: str, voice_id: str, text: str, model_id: str, out_path: Path) -> None:
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+    url = f"{elevenlabs_api_base()}/v1/text-to-speech/{voice_id}"
     payload = {
         "text": text,
         "model_id": model_id,
@@ -121,31 +183,88 @@ def elevenlabs_tts_mp3(api_key: str, voice_id: str, text: str, model_id: str, ou
         },
     }
     body = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=body, method="POST")
-    req.add_header("xi-api-key", api_key)
-    req.add_header("accept", "audio/mpeg")
-    req.add_header("content-type", "application/json")
 
-    try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            data = resp.read()
-    except urllib.error.HTTPError as e:
+    data = b""
+    for attempt in range(1, TTS_MAX_ATTEMPTS + 1):
+        req = urllib.request.Request(url, data=body, method="POST")
+        req.add_header("xi-api-key", api_key)
+        req.add_header("accept", "audio/mpeg")
+        req.add_header("content-type", "application/json")
+
+        # Exponential backoff with full jitter, unless the server says how long to wait.
+        delay = random.uniform(0, min(TTS_MAX_BACKOFF_SEC, TTS_BACKOFF_SEC * 2 ** (attempt - 1)))
         try:
-            details = e.read().decode("utf-8", errors="ignore")
-        except Exception:
-            details = ""
-        fail(f"ElevenLabs HTTP {e.code}: {details}".strip())
-    except Exception as e:
-        fail(f"ElevenLabs request failed: {e}")
+            with urllib.request.urlopen(req, timeout=60) as resp:
+                data = resp.read()
+            break
+        except urllib.error.HTTPError as e:
+            try:
+                details = e.read().decode("utf-8", errors="ignore")
+            except Exception:
+                details = ""
+            if (e.code != 429 and e.code < 500) or attempt == TTS_MAX_ATTEMPTS:
+                fail(f"ElevenLabs HTTP {e.code}: {details}".strip())
+            retry_after = _retry_after_sec(e)
+            if retry_after is not None:
+                delay = min(TTS_MAX_BACKOFF_SEC, retry_after)
+            reason = f"HTTP {e.code}"
+        except Exception as e:
+            if attempt == TTS_MAX_ATTEMPTS:
+                fail(f"ElevenLabs request failed: {e}")
+            reason = str(e)
+        print(f"Retrying TTS in {delay:.1f}s ({reason}; attempt {attempt + 1}/{TTS_MAX_ATTEMPTS}): {out_path.name}")
+        time.sleep(delay)
 
     if not data:
         fail("ElevenLabs returned empty audio")
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_bytes(data)
+    write_bytes_atomic(out_path, data)
+
+
+@dataclass(frozen=True)
+class Segment:
+    index: int
+    speaker: str
+    voice_id: str
+    text: str
+    from_sec: float
+    to_sec: float
+    raw_mp3: Path
+
+
+def fetch_tts_segments(api_key: str, model_id: str, segments: list[Segment], jobs: int = DEFAULT_TTS_JOBS) -> None:
+    """
+    Fill the raw MP3 cache for every segment not already in it, up to jobs requests at a time.
+
+    Order does not matter here: each segment has its own cache path, and assembly
+    reads them back in timeline order afterwards.
+    """
+    todo: list[Segment] = []
+    for seg in segments:
+        if seg.raw_mp3.exists():
+            print(f"Cache hit: {seg.raw_mp3.name}")
+        else:
+            todo.append(seg)
+    if not todo:
+        return
 
+    def fetch(seg: Segment) -> Segment:
+        elevenlabs_tts_mp3(api_key, seg.voice_id, seg.text, model_id, seg.raw_mp3)
+        return seg
 
-def normalize_segment_to_wav(in_mp3: Path, out_wav: Path, desired_dur: float) -> None:
-    actual = ffprobe_duration_sec(in_mp3)
+    print(f"Generating TTS for {len(todo)} line(s), {max(1, jobs)} at a time")
+    pool = ThreadPoolExecutor(max_workers=max(1, jobs))
+    try:
+        futs = [pool.submit(fetch, seg) for seg in todo]
+        for n, fut in enumerate(as_completed(futs), start=1):
+            seg = fut.result()
+            print(f"Generated TTS: {seg.speaker} line {seg.index + 1} ({n}/{len(todo)})")
+    finally:
+        # On the first failure, drop queued requests instead of spending quota on them.
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def segment_filter(actual: float, desired_dur: float) -> str:
+    # Retime a line of `actual` seconds to exactly fill its `desired_dur` slot.
     if desired_dur <= 0.05:
         desired_dur = max(0.05, actual)
     # atempo factor: speed multiplier. new_dur = actual / factor.
@@ -153,7 +272,11 @@ def normalize_segment_to_wav(in_mp3: Path, out_wav: Path, desired_dur: float) ->
     chain = atempo_chain(factor)
     filters = ",".join([f"atempo={c:.6f}" for c in chain])
     # Ensure exact duration with apad+atrim.
-    filt = f"{filters},apad,atrim=duration={desired_dur:.6f}"
+    return f"{filters},apad,atrim=duration={desired_dur:.6f}"
+
+
+def normalize_segment_to_wav(in_mp3: Path, out_wav: Path, desired_dur: float) -> None:
+    filt = segment_filter(ffprobe_duration_sec(in_mp3), desired_dur)
     run(
         [
             "ffmpeg",
@@ -163,30 +286,169 @@ def normalize_segment_to_wav(in_mp3: Path, out_wav: Path, desired_dur: float) ->
             "-filter:a",
             filt,
             "-ar",
-            "48000",
+            str(SAMPLE_RATE),
             "-ac",
-            "2",
+            str(CHANNELS),
             str(out_wav),
         ]
     )
 
 
+def normalized_cache_path(norm_dir: Path, raw_mp3: Path, desired_dur: float) -> Path:
+    # Keyed by what the output depends on, not by line index: retiming one line only
+    # invalidates that line, and inserting a line does not invalidate the rest.
+    raw_hash = hashlib.sha256(raw_mp3.read_bytes()).hexdigest()
+    key = f"{raw_hash}|{desired_dur:.6f}|{SAMPLE_RATE}|{CHANNELS}|{NORMALIZE_FILTER_VERSION}"
+    return norm_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.wav"
+
+
+def normalize_segment_cached(in_mp3: Path, out_wav: Path, desired_dur: float, refresh: bool = False) -> None:
+    if out_wav.is_file() and not refresh:
+        return
+    out_wav.parent.mkdir(parents=True, exist_ok=True)
+    # Render next to the cache entry, then rename, so a killed run never leaves a partial WAV.
+    fd, tmp = tempfile.mkstemp(prefix=f".{out_wav.stem}.", suffix=".wav", dir=out_wav.parent)
+    os.close(fd)
+    try:
+        normalize_segment_to_wav(in_mp3, Path(tmp), desired_dur)
+        os.replace(tmp, out_wav)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
 def make_silence_wav(out_wav: Path, dur: float) -> None:
+    # Written directly rather than via `ffmpeg -f lavfi anullsrc`: same samples
+    # (round(dur * rate) zero frames of s16le stereo), no process spawn per gap.
     if dur <= 0.001:
         return
-    run(
-        [
-            "ffmpeg",
-            "-y",
-            "-f",
-            "lavfi",
-            "-i",
-            "anullsrc=r=48000:cl=stereo",
-            "-t",
-            f"{dur:.6f}",
-            str(out_wav),
-        ]
-    )
+    frames = round(dur * SAMPLE_RATE)
+    out_wav.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(out_wav), "wb") as w:
+        w.setnchannels(CHANNELS)
+        w.setsampwidth(SAMPLE_WIDTH)
+        w.setframerate(SAMPLE_RATE)
+        seconds, rest = divmod(frames, SAMPLE_RATE)
+        for _ in range(seconds):
+            w.writeframesraw(_SILENCE_SECOND)
+        w.writeframesraw(_SILENCE_SECOND[: rest * CHANNELS * SAMPLE_WIDTH])
+
+
+def run_parallel(tasks: list[Callable[[], None]], jobs: int) -> None:
+    # The work happens in ffmpeg child processes, so threads are enough to keep
+    # every core busy; the first failure cancels whatever has not started yet.
+    pool = ThreadPoolExecutor(max_workers=max(1, jobs))
+    try:
+        for fut in [pool.submit(task) for task in tasks]:
+            fut.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def assemble_concat(
+    segments: list[Segment],
+    norm_dir: Path,
+    tmp_dir: Path,
+    out_mp3: Path,
+    ffmpeg_jobs: int,
+    refresh: bool = False,
+) -> None:
+    """
+    Render every timeline piece to its own WAV (lines via the normalized cache,
+    silence into tmp_dir), then join them with the ffmpeg concat demuxer.
+    With refresh, every line is re-rendered over its cache entry.
+    """
+    wav_dir = tmp_dir / "wav"
+    wav_dir.mkdir(parents=True, exist_ok=True)
+
+    # Timeline of (wav, task that renders it) in concat order; the tasks
+    # themselves are independent, so they run concurrently.
+    timeline: list[tuple[Path, Callable[[], None]]] = []
+
+    # Initial silence.
+    first_from = segments[0].from_sec
+    if first_from > 0:
+        s0 = wav_dir / "0000_silence.wav"
+        timeline.append((s0, partial(make_silence_wav, s0, first_from)))
+
+    for seg in segments:
+        i = seg.index
+        desired = max(0.05, seg.to_sec - seg.from_sec)
+
+        out_wav = normalized_cache_path(norm_dir, seg.raw_mp3, desired)
+        timeline.append((out_wav, partial(normalize_segment_cached, seg.raw_mp3, out_wav, desired, refresh)))
+
+        # Gap to next line.
+        if i + 1 < len(segments):
+            gap = max(0.0, segments[i + 1].from_sec - seg.to_sec)
+            if gap > 0.001:
+                s = wav_dir / f"{i:04d}_gap.wav"
+                timeline.append((s, partial(make_silence_wav, s, gap)))
+
+    pending = len(timeline) if refresh else sum(1 for wav, _ in timeline if not wav.is_file())
+    print(f"Rendering {pending} of {len(timeline)} segment(s), {max(1, ffmpeg_jobs)} at a time")
+    run_parallel([task for _, task in timeline], jobs=ffmpeg_jobs)
+    files = [wav for wav, _ in timeline]
+
+    # Concat into mp3.
+    list_path = tmp_dir / "concat.txt"
+    # ffmpeg concat file format: single-quoted paths. Convert to forward slashes for Windows compatibility.
+    # (Paths with a literal single quote are exceedingly rare; best-effort only.)
+    lines_for_concat = ["file '" + str(p).replace("\\", "/") + "'" for p in files]
+    list_path.write_text("\n".join(lines_for_concat) + "\n", encoding="utf-8")
+
+    run(["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(list_path)] + MP3_ENCODE_ARGS + [str(out_mp3)])
+
+
+def assemble_graph(segments: list[Segment], cache_dir: Path, tmp_dir: Path, out_mp3: Path, ffmpeg_jobs: int) -> None:
+    """
+    Render the whole episode in one ffmpeg pass: each raw MP3 is an input that is
+    retimed in-graph, silence comes from anullsrc, and the concat filter joins
+    them in timeline order. No per-segment WAVs touch the disk.
+
+    Inputs are passed relative to cache_dir (ffmpeg runs there) and the graph is
+    read from a script file, so hundreds of lines stay well within command-line
+    length limits (notably on Windows).
+    """
+    actuals: list[float] = []
+    pool = ThreadPoolExecutor(max_workers=max(1, ffmpeg_jobs))
+    try:
+        actuals = list(pool.map(ffprobe_duration_sec, [seg.raw_mp3 for seg in segments]))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    chains: list[str] = []
+    order: list[str] = []
+
+    def silence(label: str, dur: float) -> None:
+        # Same threshold and frame count as make_silence_wav.
+        if dur <= 0.001:
+            return
+        chains.append(f"anullsrc=r={SAMPLE_RATE}:cl=stereo,atrim=end_sample={round(dur * SAMPLE_RATE)}[{label}]")
+        order.append(label)
+
+    if segments[0].from_sec > 0:
+        silence("s0", segments[0].from_sec)
+    for n, (seg, actual) in enumerate(zip(segments, actuals)):
+        desired = max(0.05, seg.to_sec - seg.from_sec)
+        chains.append(
+            f"[{n}:a]{segment_filter(actual, desired)},"
+            f"aresample={SAMPLE_RATE},aformat=channel_layouts=stereo[l{n}]"
+        )
+        order.append(f"l{n}")
+        if n + 1 < len(segments):
+            silence(f"g{n}", max(0.0, segments[n + 1].from_sec - seg.to_sec))
+    chains.append("".join(f"[{label}]" for label in order) + f"concat=n={len(order)}:v=0:a=1[out]")
+
+    script = tmp_dir / "graph.txt"
+    script.write_text(";\n".join(chains) + "\n", encoding="utf-8")
+
+    cmd = ["ffmpeg", "-y"]
+    for seg in segments:
+        cmd += ["-i", seg.raw_mp3.relative_to(cache_dir).as_posix()]
+    cmd += ["-filter_complex_script", str(script), "-map", "[out]"] + MP3_ENCODE_ARGS + [str(out_mp3)]
+    print(f"Assembling {len(segments)} line(s) in one ffmpeg pass")
+    run(cmd, cwd=cache_dir)
 
 
 def render_stage_script(spec: dict[str, Any]) -> dict[str, Any]:
@@ -309,7 +571,16 @@ def write_captions(spec: dict[str, Any], captions_dir: Path) -> None:
         print(f"Wrote: {out_path}")
 
 
-def generate_audio(spec: dict[str, Any], out_mp3: Path, cache_dir: Path, force: bool, keep_backup: bool) -> None:
+def generate_audio(
+    spec: dict[str, Any],
+    out_mp3: Path,
+    cache_dir: Path,
+    force: bool,
+    keep_backup: bool,
+    tts_jobs: int = DEFAULT_TTS_JOBS,
+    ffmpeg_jobs: int = DEFAULT_FFMPEG_JOBS,
+    assembly: str = "concat",
+) -> None:
     api_key = os.environ.get("ELEVENLABS_API_KEY", "").strip()
     if not api_key:
         fail("ELEVENLABS_API_KEY is not set. Rotate your key if it was pasted into chat, then set it in your shell env.")
@@ -341,6 +612,8 @@ def generate_audio(spec: dict[str, Any], out_mp3: Path, cache_dir: Path, force:
         fail("spec has no lines[]")
 
     cache_dir.mkdir(parents=True, exist_ok=True)
+    # Second cache tier: line audio already retimed to its slot (see normalized_cache_path).
+    norm_dir = cache_dir.parent / "normalized"
 
     # Back up existing audio.
     bak_path: Path | None = None
@@ -351,86 +624,35 @@ def generate_audio(spec: dict[str, Any], out_mp3: Path, cache_dir: Path, force:
 
     with tempfile.TemporaryDirectory(prefix="pilot_audio_") as td:
         tmp_dir = Path(td)
-        wav_dir = tmp_dir / "wav"
-        wav_dir.mkdir(parents=True, exist_ok=True)
-
-        # Build a timeline of wav segments (silence + normalized line audio).
-        files: list[Path] = []
 
         # Ensure sorted by from_sec.
         lines_sorted = sorted(lines, key=lambda l: float(l.get("from_sec") or 0.0))
 
-        # Initial silence.
-        first_from = float(lines_sorted[0]["from_sec"])
-        if first_from > 0:
-            s0 = wav_dir / "0000_silence.wav"
-            make_silence_wav(s0, first_from)
-            files.append(s0)
-
+        segments: list[Segment] = []
         for i, line in enumerate(lines_sorted):
             speaker = str(line.get("speaker") or "")
             text = str(line.get("text") or "")
-            from_sec = float(line["from_sec"])
-            to_sec = float(line["to_sec"])
-            desired = max(0.05, to_sec - from_sec)
-
             voice_id = voice_by_speaker.get(speaker, "")
             if not voice_id:
                 fail(f"no voice id mapping for speaker: {speaker}")
 
             key = sha1_hex(f"{speaker}|{voice_id}|{model_id}|{text}")
             raw_mp3 = cache_dir / f"{i:04d}-{speaker}-{key[:12]}.mp3"
+            from_sec, to_sec = float(line["from_sec"]), float(line["to_sec"])
             if force and raw_mp3.exists():
+                # Drop the retimed copy of the old audio too; it is keyed by bytes about to be replaced.
+                normalized_cache_path(norm_dir, raw_mp3, max(0.05, to_sec - from_sec)).unlink(missing_ok=True)
                 raw_mp3.unlink()
+            segments.append(Segment(i, speaker, voice_id, text, from_sec, to_sec, raw_mp3))
 
-            if not raw_mp3.exists():
-                print(f"Generating TTS: {speaker} ({i + 1}/{len(lines_sorted)})")
-                elevenlabs_tts_mp3(api_key, voice_id, text, model_id, raw_mp3)
-            else:
-                print(f"Cache hit: {raw_mp3.name}")
-
-            out_wav = wav_dir / f"{i:04d}_{speaker}.wav"
-            normalize_segment_to_wav(raw_mp3, out_wav, desired)
-            files.append(out_wav)
-
-            # Gap to next line.
-            if i + 1 < len(lines_sorted):
-                next_from = float(lines_sorted[i + 1]["from_sec"])
-                gap = max(0.0, next_from - to_sec)
-                if gap > 0.001:
-                    s = wav_dir / f"{i:04d}_gap.wav"
-                    make_silence_wav(s, gap)
-                    files.append(s)
-
-        # Concat into mp3.
-        list_path = tmp_dir / "concat.txt"
-        # ffmpeg concat file format: single-quoted paths. Convert to forward slashes for Windows compatibility.
-        # (Paths with a literal single quote are exceedingly rare; best-effort only.)
-        lines_for_concat = [f"file '{str(p).replace('\\\\', '/')}'" for p in files]
-        list_path.write_text("\n".join(lines_for_concat) + "\n", encoding="utf-8")
+        # Network stage: fetch every missing line concurrently, then assemble in timeline order.
+        fetch_tts_segments(api_key, model_id, segments, jobs=tts_jobs)
 
         out_tmp = tmp_dir / "pilot.mp3"
-        run(
-            [
-                "ffmpeg",
-                "-y",
-                "-f",
-                "concat",
-                "-safe",
-                "0",
-                "-i",
-                str(list_path),
-                "-c:a",
-                "libmp3lame",
-                "-b:a",
-                "64k",
-                "-ar",
-                "48000",
-                "-ac",
-                "2",
-                str(out_tmp),
-            ]
-        )
+        if assembly == "graph":
+            assemble_graph(segments, cache_dir, tmp_dir, out_tmp, ffmpeg_jobs)
+        else:
+            assemble_concat(segments, norm_dir, tmp_dir, out_tmp, ffmpeg_jobs, refresh=force)
 
         # Only replace the published asset after successful build.
         out_mp3.parent.mkdir(parents=True, exist_ok=True)
@@ -448,8 +670,21 @@ def main(argv: list[str]) -> int:
     p = argparse.ArgumentParser(description="Generate pilot assets (script.json + VTT; optional mp3 via ElevenLabs).")
     p.add_argument("--spec", default=str(Path(__file__).with_name("pilot_v1.script.json")), help="Path to pilot script spec JSON")
     p.add_argument("--audio", action="store_true", help="Generate pilot.mp3 using ElevenLabs (requires ELEVENLABS_API_KEY + voice IDs + ffmpeg)")
-    p.add_argument("--force", action="store_true", help="Regenerate cached segments (repair mode)")
+    p.add_argument("--force", action="store_true", help="Regenerate cached segments and their normalized copies (repair mode)")
     p.add_argument("--keep-backup", action="store_true", help="Keep pilot.mp3 backup after successful generation")
+    p.add_argument(
+        "--ffmpeg-jobs",
+        type=int,
+        default=DEFAULT_FFMPEG_JOBS,
+        help=f"Concurrent ffmpeg processes for segment rendering (default: CPU count, {DEFAULT_FFMPEG_JOBS})",
+    )
+    p.add_argument(
+        "--assembly",
+        choices=ASSEMBLY_MODES,
+        default="concat",
+        help="concat: per-segment WAVs (cached) + concat demuxer; graph: one ffmpeg filter graph, no intermediate WAVs",
+    )
+    p.add_argument("--tts-jobs", type=int, default=DEFAULT_TTS_JOBS, help=f"Concurrent ElevenLabs requests (default: {DEFAULT_TTS_JOBS})")
     args = p.parse_args(argv)
 
     spec_path = Path(args.spec).expanduser().resolve()
@@ -470,7 +705,16 @@ def main(argv: list[str]) -> int:
 
     # Optional: generate audio (network + ffmpeg).
     if args.audio:
-        generate_audio(spec, audio_path, cache_dir, force=args.force, keep_backup=args.keep_backup)
+        generate_audio(
+            spec,
+            audio_path,
+            cache_dir,
+            force=args.force,
+            keep_backup=args.keep_backup,
+            tts_jobs=args.tts_jobs,
+            ffmpeg_jobs=args.ffmpeg_jobs,
+            assembly=args.assembly,
+        )
     else:
         print("Note: --audio not set. Keeping existing pilot.mp3 (public-safe default).")
 
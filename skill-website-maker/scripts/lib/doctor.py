@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .subprocessx import run
+
+
+DOCTOR_TOOLS = ("git", "gh", "node", "pnpm")
+
+# Cached results are trusted for this long even if nothing on disk changed
+# (gh tokens can expire server-side).
+DOCTOR_TTL_SEC = 6 * 60 * 60
+
+# gh prefers these over hosts.yml; only whether each is set goes into the fingerprint.
+GH_TOKEN_ENV_VARS = ("GH_TOKEN", "GITHUB_TOKEN")
+
+
+@dataclass
+class DoctorReport:
+    # Resolved executable per tool ("" when not on PATH).
+    tools: dict[str, str]
+    gh_auth_ok: bool = False
+    gh_login: str = ""
+    checked_at: float = 0.0
+    fingerprint: dict[str, Any] = field(default_factory=dict)
+    cached: bool = False
+
+    def has(self, tool: str) -> bool:
+        return bool(self.tools.get(tool))
+
+
+def gh_hosts_path() -> Path:
+    # Mirrors gh's own config lookup.
+    env = os.environ.get("GH_CONFIG_DIR", "").strip()
+    if env:
+        base = Path(env)
+    elif os.name == "nt":
+        base = Path(os.environ.get("APPDATA", str(Path.home()))) / "GitHub CLI"
+    else:
+        xdg = os.environ.get("XDG_CONFIG_HOME", "").strip()
+        base = (Path(xdg) if xdg else Path.home() / ".config") / "gh"
+    return base / "hosts.yml"
+
+
+def _mtime_ns(path: str | Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _fingerprint(tools: dict[str, str]) -> dict[str, Any]:
+    # Any reinstall/upgrade of a tool, a gh login/logout, or setting/unsetting a token env var changes this.
+    return {
+        "tools": {name: [path, _mtime_ns(path) if path else 0] for name, path in sorted(tools.items())},
+        "gh_hosts_mtime_ns": _mtime_ns(gh_hosts_path()),
+        "gh_token_env": {name: bool(os.environ.get(name, "").strip()) for name in GH_TOKEN_ENV_VARS},
+    }
+
+
+def _load_cached(cache_path: Path, fingerprint: dict[str, Any], ttl: float) -> DoctorReport | None:
+    try:
+        obj = json.loads(cache_path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(obj, dict) or obj.get("fingerprint") != fingerprint:
+        return None
+    if time.time() - float(obj.get("checked_at") or 0.0) > ttl:
+        return None
+    return DoctorReport(
+        tools={str(k): str(v) for k, v in dict(obj.get("tools") or {}).items()},
+        gh_auth_ok=bool(obj.get("gh_auth_ok")),
+        gh_login=str(obj.get("gh_login") or ""),
+        checked_at=float(obj.get("checked_at") or 0.0),
+        fingerprint=fingerprint,
+        cached=True,
+    )
+
+
+def doctor_report(cache_path: Path | None, refresh: bool = False, ttl: float = DOCTOR_TTL_SEC) -> DoctorReport:
+    """
+    Tool paths plus gh auth state, reusing a cached result when possible.
+
+    Resolving tool paths is cheap and always done; the gh subprocesses
+    (`gh auth status`, `gh api user`) only run when the cache is missing,
+    older than ttl, or its fingerprint (tool paths + mtimes, gh hosts.yml
+    mtime, which gh token env vars are set) no longer matches. Failed gh
+    auth is never cached, so a fix takes effect on the next run.
+    """
+    tools = {name: shutil.which(name) or "" for name in DOCTOR_TOOLS}
+    fingerprint = _fingerprint(tools)
+    if cache_path is not None and not refresh:
+        hit = _load_cached(cache_path, fingerprint, ttl)
+        if hit is not None:
+            return hit
+
+    report = DoctorReport(tools=tools, checked_at=time.time(), fingerprint=fingerprint)
+    if report.has("gh"):
+        try:
+            report.gh_auth_ok = run(["gh", "auth", "status"], check=False).returncode == 0
+        except Exception:
+            report.gh_auth_ok = False
+        if report.gh_auth_ok:
+            cp = run(["gh", "api", "user", "-q", ".login"], check=False)
+            if cp.returncode == 0:
+                report.gh_login = cp.stdout.strip()
+
+    if cache_path is not None:
+        obj = asdict(report)
+        obj.pop("cached", None)
+        try:
+            if report.gh_auth_ok:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                cache_path.write_text(json.dumps(obj, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            else:
+                # Drop any older passing result rather than leave it to be served again.
+                cache_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+    return report
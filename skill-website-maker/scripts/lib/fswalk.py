@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+
+# Directories that never belong in a published skill. The secret scan and the
+# skill copy share this set, so the scan covers exactly what gets published.
+SKILL_SKIP_DIRS = frozenset(
+    {
+        ".git",
+        "__pycache__",
+        "node_modules",
+        "dist",
+    }
+)
+
+# Templates may be developed locally, and those working trees can contain
+# build artifacts. Never copy heavy or generated directories into the
+# rendered repos.
+TEMPLATE_SKIP_DIRS = SKILL_SKIP_DIRS | {
+    ".netlify",
+    ".playwright-cli",
+    "output",
+}
+
+SKIP_FILES = (
+    "*.pyc",
+    "*.pyo",
+    ".DS_Store",
+    "Thumbs.db",
+)
+
+
+def walk_files(
+    root: Path,
+    skip_dirs: Iterable[str] = SKILL_SKIP_DIRS,
+    skip_files: Iterable[str] = SKIP_FILES,
+) -> Iterator[Path]:
+    """
+    Yield files under root in sorted, depth-first order.
+
+    Directories named in skip_dirs are pruned without being entered, so their
+    contents are never stat-ed. skip_files holds fnmatch patterns for basenames.
+    """
+    skip_dirs = frozenset(skip_dirs)
+    skip_files = tuple(skip_files)
+    stack = [str(root)]
+    while stack:
+        cur = stack.pop()
+        try:
+            with os.scandir(cur) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs: list[str] = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name not in skip_dirs:
+                    subdirs.append(entry.path)
+                continue
+            if any(fnmatch.fnmatch(entry.name, pat) for pat in skip_files):
+                continue
+            yield Path(entry.path)
+        # Reverse so the stack pops subdirectories in sorted order.
+        stack.extend(reversed(subdirs))
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def tree_digest(
+    root: Path,
+    skip_dirs: Iterable[str] = SKILL_SKIP_DIRS,
+    skip_files: Iterable[str] = SKIP_FILES,
+    prev: dict[str, Any] | None = None,
+    seen: dict[str, Any] | None = None,
+) -> str:
+    """
+    sha256 over the relative paths and contents of every file walk_files yields.
+
+    prev maps absolute paths to [size, mtime_ns, sha256] from an earlier run;
+    files whose size and mtime still match are only stat-ed, not read. Every
+    file's current entry is recorded in seen, which the caller persists.
+    """
+    h = hashlib.sha256()
+    for p in walk_files(root, skip_dirs, skip_files):
+        st = p.stat()
+        key = str(p)
+        entry = (prev or {}).get(key)
+        if isinstance(entry, list) and len(entry) == 3 and entry[:2] == [st.st_size, st.st_mtime_ns]:
+            digest = str(entry[2])
+        else:
+            digest = file_sha256(p)
+        if seen is not None:
+            seen[key] = [st.st_size, st.st_mtime_ns, digest]
+        h.update(p.relative_to(root).as_posix().encode("utf-8") + b"\0")
+        h.update(digest.encode("ascii") + b"\n")
+    return h.hexdigest()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from .subprocessx import run
+
+
+@dataclass(frozen=True)
+class RepoState:
+    exists: bool
+    private: bool = False
+
+
+@dataclass(frozen=True)
+class GitHubState:
+    """Snapshot of what a publish needs to know about GitHub, from one API call."""
+
+    viewer_login: str
+    # Only repos whose state is known; a missing key means "ask gh directly".
+    repos: dict[str, RepoState] = field(default_factory=dict)
+    releases: dict[tuple[str, str], bool] = field(default_factory=dict)
+
+    def repo(self, name: str) -> RepoState | None:
+        return self.repos.get(name)
+
+    def release_exists(self, repo: str, tag: str) -> bool | None:
+        return self.releases.get((repo, tag))
+
+
+def _build_query(repos: Sequence[str], releases: Sequence[tuple[str, str]]) -> tuple[str, dict[str, str]]:
+    params = ["$owner: String!"]
+    variables: dict[str, str] = {}
+    fields = ["viewer { login }"]
+    for i, repo in enumerate(repos):
+        params.append(f"$r{i}: String!")
+        variables[f"r{i}"] = repo
+        sub = ["isPrivate"]
+        for j, (rel_repo, tag) in enumerate(releases):
+            if rel_repo != repo:
+                continue
+            params.append(f"$t{j}: String!")
+            variables[f"t{j}"] = tag
+            sub.append(f"t{j}: release(tagName: $t{j}) {{ tagName }}")
+        fields.append(f"r{i}: repository(owner: $owner, name: $r{i}) {{ {' '.join(sub)} }}")
+    query = f"query({', '.join(params)}) {{ {' '.join(fields)} }}"
+    return query, variables
+
+
+def probe_github_state(
+    owner: str,
+    repos: Sequence[str],
+    releases: Sequence[tuple[str, str]] = (),
+) -> GitHubState | None:
+    """
+    Resolve the viewer login, repo existence/visibility and release existence
+    with a single `gh api graphql` call.
+
+    Returns None when the probe itself fails (gh missing, auth, network), so
+    callers can fall back to the individual gh commands.
+    """
+    repos = list(dict.fromkeys(repos))
+    query, variables = _build_query(repos, releases)
+    cmd = ["gh", "api", "graphql", "-f", f"query={query}", "-f", f"owner={owner}"]
+    for k, v in variables.items():
+        cmd += ["-f", f"{k}={v}"]
+    try:
+        cp = run(cmd, check=False)
+    except OSError:
+        return None
+
+    # GraphQL reports missing repos as errors alongside partial data, and gh
+    # exits non-zero in that case, so parse stdout regardless of exit code.
+    try:
+        payload = json.loads(cp.stdout or "")
+    except ValueError:
+        return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("data"), dict):
+        return None
+    data: dict[str, Any] = payload["data"]
+
+    not_found: set[str] = set()
+    for err in payload.get("errors") or []:
+        if isinstance(err, dict) and err.get("type") == "NOT_FOUND":
+            path = err.get("path") or []
+            if path:
+                not_found.add(str(path[0]))
+
+    viewer = data.get("viewer") if isinstance(data.get("viewer"), dict) else {}
+    state = GitHubState(viewer_login=str(viewer.get("login") or ""))
+    for i, repo in enumerate(repos):
+        node = data.get(f"r{i}")
+        if isinstance(node, dict):
+            state.repos[repo] = RepoState(exists=True, private=bool(node.get("isPrivate")))
+        elif f"r{i}" in not_found:
+            state.repos[repo] = RepoState(exists=False)
+        else:
+            continue
+        for j, (rel_repo, tag) in enumerate(releases):
+            if rel_repo == repo:
+                state.releases[(repo, tag)] = isinstance(node, dict) and isinstance(node.get(f"t{j}"), dict)
+    return state
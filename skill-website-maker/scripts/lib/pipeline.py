@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .subprocessx import kill_active_children
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[[], None]
+    deps: tuple[str, ...] = field(default_factory=tuple)
+
+
+def run_stages(stages: list[Stage], jobs: int = 4) -> None:
+    """
+    Run stages as soon as all of their deps have finished, up to jobs at once.
+
+    Ready stages start in list order, so jobs=1 runs a topologically ordered
+    list strictly in sequence. On the first failure no new stages are started;
+    in-flight stages are allowed to finish, then the error is re-raised.
+    """
+    by_name = {s.name: s for s in stages}
+    if len(by_name) != len(stages):
+        raise ValueError("duplicate stage names")
+    for s in stages:
+        for d in s.deps:
+            if d not in by_name:
+                raise ValueError(f"stage {s.name!r} depends on unknown stage {d!r}")
+
+    done: set[str] = set()
+    pending = list(stages)
+    running: dict[Future[None], str] = {}
+    error: BaseException | None = None
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            if error is None:
+                for s in list(pending):
+                    if len(running) >= max(1, jobs):
+                        break
+                    if all(d in done for d in s.deps):
+                        pending.remove(s)
+                        running[pool.submit(s.fn)] = s.name
+            if not running:
+                if error is None and pending:
+                    names = ", ".join(s.name for s in pending)
+                    raise RuntimeError(f"stage dependency cycle: {names}")
+                break
+
+            try:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                # Stages run on pool threads, which never see Ctrl-C; stop their
+                # children here, or leaving the pool would wait for them to exit.
+                kill_active_children()
+                raise
+            for fut in finished:
+                name = running.pop(fut)
+                exc = fut.exception()
+                if exc is not None:
+                    if error is None:
+                        error = exc
+                    continue
+                done.add(name)
+
+    if error is not None:
+        raise error
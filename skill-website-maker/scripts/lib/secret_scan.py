@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, BinaryIO
+
+from .fswalk import SKILL_SKIP_DIRS, SKIP_FILES, walk_files
 
 
 @dataclass(frozen=True)
@@ -39,10 +46,17 @@ BLOCKED_EXTS = {
 # Content patterns (avoid false positives like "OPENAI_API_KEY" docs).
 CONTENT_PATTERNS: list[tuple[re.Pattern[str], str]] = [
     (re.compile(r"-----BEGIN (?:RSA |EC |)PRIVATE KEY-----"), "private key block"),
-    (re.compile(r"\\bAKIA[0-9A-Z]{16}\\b"), "possible AWS access key id"),
-    (re.compile(r"\\bgh[opsu]_[A-Za-z0-9]{20,}\\b"), "possible GitHub token"),
-    (re.compile(r"\\bsk-[A-Za-z0-9]{20,}\\b"), "possible API key"),
-    (re.compile(r"\\bxox[baprs]-[A-Za-z0-9-]{10,}\\b"), "possible Slack token"),
+    (re.compile(r"\bAKIA[0-9A-Z]{16}\b"), "possible AWS access key id"),
+    (re.compile(r"\bgh[opsu]_[A-Za-z0-9]{20,}\b"), "possible GitHub token"),
+    (re.compile(r"\bsk-[A-Za-z0-9]{20,}\b"), "possible API key"),
+    (re.compile(r"\bxox[baprs]-[A-Za-z0-9-]{10,}\b"), "possible Slack token"),
+]
+
+# Byte-level twins of CONTENT_PATTERNS. Decoding pure-ASCII input is the
+# identity, so matching raw bytes gives the same verdict without paying for the
+# text decode (most skill files are ASCII).
+_BYTE_PATTERNS: list[tuple[re.Pattern[bytes], str]] = [
+    (re.compile(rx.pattern.encode("ascii"), rx.flags & ~re.UNICODE), reason) for rx, reason in CONTENT_PATTERNS
 ]
 
 TEXT_EXTS = {
@@ -62,14 +76,143 @@ TEXT_EXTS = {
     ".css",
 }
 
+# Files per process-pool task when scanning in parallel.
+SCAN_BATCH_SIZE = 256
 
-def scan_dir(root: Path) -> list[Finding]:
-    findings: list[Finding] = []
+# Files are read in fixed-size chunks so peak memory stays bounded regardless
+# of file size. Each chunk is matched together with the last SCAN_OVERLAP bytes
+# of the previous one, so any match up to SCAN_OVERLAP bytes long that straddles
+# a chunk boundary is still found.
+SCAN_CHUNK_SIZE = 1 << 20
+SCAN_OVERLAP = 4096
+
+
+def _first_match(data: bytes, limit: int) -> int | None:
+    # Lowest CONTENT_PATTERNS index below limit that matches data.
+    if data.isascii():
+        for i in range(limit):
+            if _BYTE_PATTERNS[i][0].search(data):
+                return i
+        return None
+
+    # Patterns never span CR/LF, so skipping newline translation is safe here.
+    text = data.decode("utf-8", errors="ignore")
+    for i in range(limit):
+        if CONTENT_PATTERNS[i][0].search(text):
+            return i
+    return None
+
+
+def match_content(data: bytes) -> str | None:
+    """Return the reason of the first CONTENT_PATTERNS entry found in data, if any."""
+    idx = _first_match(data, len(CONTENT_PATTERNS))
+    return CONTENT_PATTERNS[idx][1] if idx is not None else None
+
+
+def pattern_set_version() -> str:
+    """Fingerprint of every rule that decides a scan verdict (invalidates the scan cache)."""
+    rules = {
+        "blocked_basenames": sorted(BLOCKED_BASENAMES),
+        "allowed_basenames": sorted(ALLOWED_BASENAMES),
+        "blocked_exts": sorted(BLOCKED_EXTS),
+        "text_exts": sorted(TEXT_EXTS),
+        "content_patterns": [[rx.pattern, rx.flags, reason] for rx, reason in CONTENT_PATTERNS],
+    }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _load_cache(cache_path: Path, version: str) -> dict[str, Any]:
+    try:
+        obj = json.loads(cache_path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    if not isinstance(obj, dict) or obj.get("version") != version or not isinstance(obj.get("files"), dict):
+        return {}
+    return obj["files"]
+
+
+def _save_cache(cache_path: Path, version: str, files: dict[str, Any]) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_name(cache_path.name + ".tmp")
+    tmp.write_text(json.dumps({"version": version, "files": files}, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, cache_path)
+
+
+def _file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(SCAN_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def scan_stream(f: BinaryIO) -> tuple[str | None, str]:
+    """
+    Match CONTENT_PATTERNS over a binary stream in bounded memory.
 
-    for p in root.rglob("*"):
-        if p.is_dir():
+    Returns (reason, sha256 of the content). Like match_content, the first
+    pattern in list order wins, even when a later pattern matched an earlier
+    chunk.
+    """
+    h = hashlib.sha256()
+    best: int | None = None
+    tail = b""
+    while chunk := f.read(SCAN_CHUNK_SIZE):
+        h.update(chunk)
+        if best == 0:
             continue
+        window = tail + chunk
+        idx = _first_match(window, len(CONTENT_PATTERNS) if best is None else best)
+        if idx is not None:
+            best = idx
+        tail = window[-SCAN_OVERLAP:]
+    reason = CONTENT_PATTERNS[best][1] if best is not None else None
+    return reason, h.hexdigest()
 
+
+def _scan_content(path: str, clean_digest: str | None) -> tuple[str | None, str]:
+    # Returns (reason, sha256 of content). An empty digest means the file was unreadable.
+    try:
+        if clean_digest:
+            digest = _file_digest(path)
+            if digest == clean_digest:
+                # Touched but unchanged (e.g. after a checkout): keep the cached clean verdict.
+                return None, digest
+        with open(path, "rb") as f:
+            return scan_stream(f)
+    except Exception:
+        return None, ""
+
+
+def _scan_batch(items: list[tuple[str, str | None]]) -> list[tuple[str | None, str]]:
+    # Process pool entry point: must stay a picklable module-level function.
+    return [_scan_content(path, clean_digest) for path, clean_digest in items]
+
+
+def scan_dir(root: Path, jobs: int = 1, cache_path: Path | None = None) -> list[Finding]:
+    """
+    Scan a folder for blocked files and secret-looking content.
+
+    Directories that are never published (SKILL_SKIP_DIRS) are pruned.
+
+    jobs > 1 fans content checks out to a process pool (jobs <= 0 means one
+    worker per CPU). Findings are reported in walk order either way.
+
+    With cache_path, clean verdicts are persisted per file (size, mtime_ns,
+    sha256) and reused while the file stat is unchanged, so repeat scans only
+    read changed files. The cache is discarded whenever pattern_set_version()
+    changes. Files with findings are never cached.
+    """
+    version = pattern_set_version()
+    cached = _load_cache(cache_path, version) if cache_path else {}
+    fresh: dict[str, Any] = {}
+
+    # (path, reason) in walk order; reason None means "needs a content check".
+    entries: list[tuple[str, str | None]] = []
+    # Content checks still to run: (path, cache key, stat, cached clean digest).
+    to_read: list[tuple[str, str, os.stat_result | None, str | None]] = []
+
+    for p in walk_files(root, SKILL_SKIP_DIRS, SKIP_FILES):
         name = p.name
         lower = name.lower()
 
@@ -77,25 +220,64 @@ def scan_dir(root: Path) -> list[Finding]:
             continue
 
         if lower in BLOCKED_BASENAMES:
-            findings.append(Finding(str(p), f"blocked filename: {name}"))
+            entries.append((str(p), f"blocked filename: {name}"))
             continue
 
         if p.suffix.lower() in BLOCKED_EXTS:
-            findings.append(Finding(str(p), f"blocked extension: {p.suffix}"))
+            entries.append((str(p), f"blocked extension: {p.suffix}"))
             continue
 
         if p.suffix.lower() not in TEXT_EXTS:
             continue
 
-        try:
-            text = p.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            continue
+        key = p.relative_to(root).as_posix()
+        st: os.stat_result | None = None
+        clean_digest: str | None = None
+        if cache_path:
+            try:
+                st = p.stat()
+            except OSError:
+                st = None
+            hit = cached.get(key)
+            if st is not None and isinstance(hit, dict) and hit.get("clean"):
+                if hit.get("size") == st.st_size and hit.get("mtime_ns") == st.st_mtime_ns:
+                    fresh[key] = hit
+                    continue
+                clean_digest = str(hit.get("sha256") or "") or None
 
-        for rx, reason in CONTENT_PATTERNS:
-            if rx.search(text):
-                findings.append(Finding(str(p), reason))
-                break
+        entries.append((str(p), None))
+        to_read.append((str(p), key, st, clean_digest))
 
-    return findings
+    items = [(path, clean_digest) for path, _, _, clean_digest in to_read]
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(items) > SCAN_BATCH_SIZE:
+        batches = [items[i : i + SCAN_BATCH_SIZE] for i in range(0, len(items), SCAN_BATCH_SIZE)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # map() yields batch results in submission order, so the merge is deterministic.
+            content = [r for batch in pool.map(_scan_batch, batches) for r in batch]
+    else:
+        content = _scan_batch(items)
 
+    content_reasons: list[str | None] = []
+    for (_, key, st, _), (reason, digest) in zip(to_read, content):
+        content_reasons.append(reason)
+        if st is not None and digest and reason is None:
+            fresh[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest, "clean": True}
+
+    findings: list[Finding] = []
+    content_iter = iter(content_reasons)
+    for path, reason in entries:
+        if reason is None:
+            reason = next(content_iter)
+        if reason:
+            findings.append(Finding(path, reason))
+
+    if cache_path:
+        try:
+            _save_cache(cache_path, version, fresh)
+        except OSError:
+            # The cache is an optimisation only; never fail a scan over it.
+            pass
+
+    return findings
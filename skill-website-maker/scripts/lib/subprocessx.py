@@ -1,10 +1,225 @@
 from __future__ import annotations
 
+import json
 import os
+import random
+import re
 import subprocess
 import shutil
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Callable, Sequence
+
+# Lines of output kept for CmdError when streaming.
+STREAM_TAIL_LINES = 200
+
+# Exit code reported for a command killed by its policy timeout (as timeout(1) does).
+TIMEOUT_RETURNCODE = 124
+
+# Output that marks a failure as transient: rate limits, 5xx, flaky networks.
+TRANSIENT_PATTERNS = (
+    r"rate limit",
+    r"HTTP 429",
+    r"HTTP 5\d\d",
+    r"\b50[0-4] (?:Internal Server Error|Bad Gateway|Service Unavailable|Gateway Time-?out)",
+    r"returned error: 5\d\d",
+    r"Could not resolve host",
+    r"Connection (?:reset|refused|timed out)",
+    r"Operation timed out",
+    r"TLS handshake timeout",
+    r"unexpected disconnect|early EOF|RPC failed",
+    r"ECONNRESET|ETIMEDOUT|EAI_AGAIN|ERR_PNPM_FETCH_5\d\d",
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    # None/0 = wait forever.
+    timeout_sec: float | None = None
+    # Total tries, including the first one.
+    attempts: int = 1
+    # Sleep before retry n is up to backoff_sec * 2**(n-1), capped, with full jitter.
+    backoff_sec: float = 2.0
+    max_backoff_sec: float = 30.0
+    # Regexes (case-insensitive) over the command output; a timeout always counts.
+    retry_on: tuple[str, ...] = TRANSIENT_PATTERNS
+
+
+GIT_NETWORK_SUBCOMMANDS = {"clone", "fetch", "pull", "push", "ls-remote"}
+
+# Not idempotent: if the first try reached the server, a retry fails with
+# "already exists". Callers re-check for the object instead of retrying.
+GH_CREATE_SUBCOMMANDS = {("repo", "create"), ("release", "create")}
+
+DEFAULT_POLICIES: dict[str, RetryPolicy] = {
+    "gh": RetryPolicy(timeout_sec=600, attempts=4),
+    "gh-create": RetryPolicy(timeout_sec=600, retry_on=()),
+    "git-network": RetryPolicy(timeout_sec=900, attempts=3),
+    "pnpm-install": RetryPolicy(timeout_sec=1800, attempts=2),
+    # Local work (git add/commit, pnpm check/build, ...) is never retried.
+    "default": RetryPolicy(retry_on=()),
+}
+
+_policies = dict(DEFAULT_POLICIES)
+
+# Children that run in their own session (see _popen). Ctrl-C does not reach
+# them, and the thread waiting on them may be a pool worker that never sees
+# KeyboardInterrupt, so the main thread kills them via kill_active_children().
+_live: dict[int, subprocess.Popen[str]] = {}
+_live_lock = threading.Lock()
+_interrupted = threading.Event()
+
+
+def _kill_tree(proc: subprocess.Popen[str], own_group: bool) -> None:
+    try:
+        if own_group:
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except OSError:
+        pass
+
+
+def kill_active_children() -> None:
+    """Kill every child process group still running; no further retries start."""
+    _interrupted.set()
+    with _live_lock:
+        procs = list(_live.values())
+    for proc in procs:
+        _kill_tree(proc, own_group=True)
+
+
+# Opt-in JSONL trace of every command run through run(); see enable_trace().
+_trace_path: Path | None = None
+_trace_session = ""
+_trace_lock = threading.Lock()
+
+
+def enable_trace(path: Path | None, session: str = "") -> None:
+    """Append one JSON line per run() call to path (None disables tracing)."""
+    global _trace_path, _trace_session
+    _trace_path = path
+    _trace_session = session
+
+
+def subcommand_of(argv: Sequence[str]) -> str:
+    # First non-option argument after the program name ("push", "repo", "install").
+    for a in list(argv)[1:]:
+        if not a.startswith("-"):
+            return a
+    return ""
+
+
+def _record_trace(
+    cmd: Sequence[str],
+    cwd: Path | None,
+    returncode: int,
+    wall_sec: float,
+    output_bytes: int,
+    attempt: int = 1,
+) -> None:
+    if _trace_path is None:
+        return
+    rec: dict[str, Any] = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "session": _trace_session,
+        "argv0": Path(cmd[0]).name if cmd else "",
+        "subcommand": subcommand_of(cmd),
+        "cwd": str(cwd) if cwd else os.getcwd(),
+        "returncode": returncode,
+        "attempt": attempt,
+        "wall_sec": round(wall_sec, 4),
+        "output_bytes": output_bytes,
+    }
+    try:
+        with _trace_lock:
+            _trace_path.parent.mkdir(parents=True, exist_ok=True)
+            with _trace_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, sort_keys=True) + "\n")
+    except OSError:
+        # Tracing must never break the command it observes.
+        pass
+
+
+def command_class(cmd: Sequence[str]) -> str:
+    if not cmd:
+        return "default"
+    name = Path(cmd[0]).name.lower()
+    for ext in (".exe", ".cmd", ".bat"):
+        name = name.removesuffix(ext)
+    sub = subcommand_of(cmd)
+    if name == "gh" and tuple(cmd[1:3]) in GH_CREATE_SUBCOMMANDS:
+        return "gh-create"
+    if name == "gh" and list(cmd[1:3]) == ["repo", "clone"]:
+        # A git clone underneath; gets the long transfer budget, not the API one.
+        return "git-network"
+    if name == "gh":
+        return "gh"
+    if name == "git" and sub in GIT_NETWORK_SUBCOMMANDS:
+        return "git-network"
+    if name == "pnpm" and sub in {"install", "i", "add"}:
+        return "pnpm-install"
+    return "default"
+
+
+def configure_policies(overrides: dict[str, Any] | None) -> None:
+    """
+    Apply project.json "subprocess_policy" overrides on top of DEFAULT_POLICIES, e.g.
+    {"gh": {"timeout_sec": 120, "attempts": 5}, "git-network": {"backoff_sec": 5}}.
+    Raises ValueError on unknown classes or fields.
+    """
+    merged = dict(DEFAULT_POLICIES)
+    known = {f.name for f in fields(RetryPolicy)}
+    for cls, raw in dict(overrides or {}).items():
+        if cls not in merged:
+            raise ValueError(f"unknown command class {cls!r} (expected one of: {', '.join(merged)})")
+        if not isinstance(raw, dict) or set(raw) - known:
+            raise ValueError(f"subprocess_policy.{cls}: expected an object with keys {', '.join(sorted(known))}")
+        vals = dict(raw)
+        if "retry_on" in vals:
+            pats = vals["retry_on"]
+            # A bare string would iterate into one-letter patterns that match almost anything.
+            if not isinstance(pats, list) or not all(isinstance(x, str) for x in pats):
+                raise ValueError(f"subprocess_policy.{cls}.retry_on: expected a list of regex strings")
+            for pat in pats:
+                try:
+                    re.compile(pat)
+                except re.error as e:
+                    raise ValueError(f"subprocess_policy.{cls}.retry_on: bad regex {pat!r}: {e}") from None
+            vals["retry_on"] = tuple(pats)
+        if "attempts" in vals:
+            vals["attempts"] = max(1, int(vals["attempts"]))
+        merged[cls] = replace(merged[cls], **vals)
+    global _policies
+    _policies = merged
+
+
+def policy_for(cmd: Sequence[str]) -> RetryPolicy:
+    return _policies.get(command_class(cmd), _policies["default"])
+
+
+def _retry_reason(policy: RetryPolicy, returncode: int, output: str) -> str:
+    # Returns why the failure looks transient, or "" if it does not.
+    if returncode == TIMEOUT_RETURNCODE:
+        return f"timed out after {policy.timeout_sec:g}s"
+    for pat in policy.retry_on:
+        m = re.search(pat, output, re.IGNORECASE)
+        if m:
+            return m.group(0)
+    return ""
+
+
+def _sleep_before_retry(cmd: Sequence[str], policy: RetryPolicy, attempt: int, reason: str) -> None:
+    delay = random.uniform(0, min(policy.max_backoff_sec, policy.backoff_sec * 2 ** (attempt - 1)))
+    label = f"{Path(cmd[0]).name} {subcommand_of(cmd)}".strip()
+    sys.stderr.write(f"Retrying {label} (attempt {attempt + 1}/{policy.attempts}) in {delay:.1f}s: {reason}\n")
+    sys.stderr.flush()
+    time.sleep(delay)
 
 
 class CmdError(RuntimeError):
@@ -16,12 +231,7 @@ class CmdError(RuntimeError):
         self.stderr = stderr
 
 
-def run(
-    cmd: Sequence[str],
-    cwd: Path | None = None,
-    check: bool = True,
-    capture: bool = True,
-) -> subprocess.CompletedProcess[str]:
+def _argv(cmd: Sequence[str]) -> list[str]:
     argv = list(cmd)
 
     # Windows: tools installed via npm/pnpm often resolve to .cmd shims, which
@@ -30,14 +240,211 @@ def run(
         resolved = shutil.which(argv[0])
         if resolved and resolved.lower().endswith((".cmd", ".bat")):
             argv = ["cmd.exe", "/d", "/s", "/c"] + argv
+    return argv
 
-    cp = subprocess.run(
-        argv,
+
+def _popen(cmd: Sequence[str], cwd: Path | None, own_group: bool, **kwargs: Any) -> subprocess.Popen[str]:
+    proc = subprocess.Popen(
+        _argv(cmd),
         cwd=str(cwd) if cwd else None,
-        text=True,
-        capture_output=capture,
         shell=False,
+        # Own process group, so a timeout also kills grandchildren (gh -> git,
+        # pnpm -> node) that would otherwise keep running, and keep the output
+        # pipe open, after the command is given up on.
+        start_new_session=own_group,
+        **kwargs,
     )
+    if own_group:
+        with _live_lock:
+            _live[proc.pid] = proc
+    return proc
+
+
+def _run_once(
+    cmd: Sequence[str],
+    cwd: Path | None,
+    capture: bool,
+    policy: RetryPolicy,
+) -> subprocess.CompletedProcess[str]:
+    own_group = os.name != "nt" and bool(policy.timeout_sec)
+    pipe = subprocess.PIPE if capture else None
+    proc = _popen(cmd, cwd, own_group, stdout=pipe, stderr=pipe, text=True)
+    try:
+        try:
+            stdout, stderr = proc.communicate(timeout=policy.timeout_sec or None)
+        except subprocess.TimeoutExpired:
+            # The retry (and its before_retry cleanup) must not race a git still writing.
+            _kill_tree(proc, own_group)
+            stdout, stderr = proc.communicate()
+            stderr = (stderr or "") + f"\ntimed out after {policy.timeout_sec:g}s\n"
+            return subprocess.CompletedProcess(list(cmd), TIMEOUT_RETURNCODE, stdout, stderr)
+        except BaseException:
+            # e.g. Ctrl-C: the child's own session does not receive it.
+            _kill_tree(proc, own_group)
+            proc.wait()
+            raise
+    finally:
+        with _live_lock:
+            _live.pop(proc.pid, None)
+    return subprocess.CompletedProcess(list(cmd), proc.returncode, stdout, stderr)
+
+
+def run(
+    cmd: Sequence[str],
+    cwd: Path | None = None,
+    check: bool = True,
+    capture: bool = True,
+    before_retry: Callable[[], None] | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """
+    Run cmd under its command-class RetryPolicy (see policy_for): a timeout, or
+    a failure whose output matches retry_on, is retried with jittered backoff.
+    before_retry runs ahead of each retry, e.g. to remove a partial clone that a
+    killed git could not clean up.
+    """
+    policy = policy_for(cmd)
+    attempt = 1
+    while True:
+        started = time.perf_counter()
+        cp = _run_once(cmd, cwd, capture, policy)
+        output_bytes = len((cp.stdout or "").encode("utf-8")) + len((cp.stderr or "").encode("utf-8"))
+        _record_trace(cmd, cwd, cp.returncode, time.perf_counter() - started, output_bytes, attempt)
+        if cp.returncode == 0 or attempt >= policy.attempts:
+            break
+        reason = _retry_reason(policy, cp.returncode, (cp.stdout or "") + (cp.stderr or ""))
+        if not reason or _interrupted.is_set():
+            break
+        _sleep_before_retry(cmd, policy, attempt, reason)
+        if before_retry is not None:
+            before_retry()
+        attempt += 1
+
     if check and cp.returncode != 0:
         raise CmdError(cmd, cp.returncode, cp.stdout or "", cp.stderr or "")
     return cp
+
+
+def run_streaming(
+    cmd: Sequence[str],
+    cwd: Path | None = None,
+    check: bool = True,
+    echo: bool = True,
+    log_path: Path | None = None,
+    prefix: str = "",
+    timed: bool = False,
+    tail_lines: int = STREAM_TAIL_LINES,
+    before_retry: Callable[[], None] | None = None,
+) -> subprocess.CompletedProcess[str]:
+    """
+    Like run(), but output is forwarded line by line as it arrives instead of
+    being buffered until exit.
+
+    stderr is merged into stdout so lines keep their order. Each line is echoed
+    to the console (with prefix) and/or appended to log_path; only the last
+    tail_lines are kept in memory. The returned stdout is that tail, and so is
+    CmdError.stdout when the output was not already echoed. timed prints the
+    wall time once the command exits. Timeouts, retries and before_retry work
+    as in run().
+    """
+    policy = policy_for(cmd)
+    attempt = 1
+    while True:
+        returncode, wall, out = _stream_once(cmd, cwd, echo, log_path, prefix, tail_lines, policy, attempt)
+        if timed:
+            label = f"{Path(cmd[0]).name} {subcommand_of(cmd)}".strip()
+            print(f"{prefix}{label} finished in {wall:.1f}s (exit {returncode})", flush=True)
+        if returncode == 0 or attempt >= policy.attempts:
+            break
+        reason = _retry_reason(policy, returncode, out)
+        if not reason or _interrupted.is_set():
+            break
+        _sleep_before_retry(cmd, policy, attempt, reason)
+        if before_retry is not None:
+            before_retry()
+        attempt += 1
+
+    if check and returncode != 0:
+        raise CmdError(cmd, returncode, "" if echo else out, "")
+    return subprocess.CompletedProcess(list(cmd), returncode, out, "")
+
+
+def _stream_once(
+    cmd: Sequence[str],
+    cwd: Path | None,
+    echo: bool,
+    log_path: Path | None,
+    prefix: str,
+    tail_lines: int,
+    policy: RetryPolicy,
+    attempt: int,
+) -> tuple[int, float, str]:
+    tail: deque[str] = deque(maxlen=max(1, tail_lines))
+    output_bytes = 0
+    timed_out = threading.Event()
+    started = time.perf_counter()
+    log = log_path.open("a", encoding="utf-8") if log_path is not None else None
+    try:
+        if log is not None:
+            log.write(f"$ {' '.join(cmd)}\n")
+            log.flush()
+        own_group = os.name != "nt" and bool(policy.timeout_sec)
+        proc = _popen(
+            cmd,
+            cwd,
+            own_group,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+
+        def kill() -> None:
+            _kill_tree(proc, own_group)
+
+        def on_timeout() -> None:
+            timed_out.set()
+            kill()
+
+        watchdog = threading.Timer(policy.timeout_sec, on_timeout) if policy.timeout_sec else None
+        if watchdog is not None:
+            watchdog.daemon = True
+            watchdog.start()
+
+        try:
+            assert proc.stdout is not None
+            with proc.stdout:
+                for line in proc.stdout:
+                    output_bytes += len(line.encode("utf-8"))
+                    tail.append(line)
+                    if echo:
+                        sys.stdout.write(prefix + line if line.endswith("\n") else prefix + line + "\n")
+                        sys.stdout.flush()
+                    if log is not None:
+                        log.write(line)
+                        log.flush()
+            returncode = proc.wait()
+        except BaseException:
+            # e.g. Ctrl-C in this thread: the child's own session does not receive it.
+            kill()
+            raise
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+            with _live_lock:
+                _live.pop(proc.pid, None)
+        if timed_out.is_set():
+            returncode = TIMEOUT_RETURNCODE
+            note = f"timed out after {policy.timeout_sec:g}s\n"
+            tail.append(note)
+            if echo:
+                sys.stdout.write(prefix + note)
+            if log is not None:
+                log.write(note)
+    finally:
+        if log is not None:
+            log.close()
+
+    wall = time.perf_counter() - started
+    _record_trace(cmd, cwd, returncode, wall, output_bytes, attempt)
+    return returncode, wall, "".join(tail)
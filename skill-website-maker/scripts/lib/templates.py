@@ -1,8 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import re
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable, Iterable, TypeVar
 
+from .fswalk import TEMPLATE_SKIP_DIRS, file_sha256, walk_files
+
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+# Worker threads for copying/rendering template files (blocking file I/O).
+RENDER_JOBS = 8
 
 TEXT_EXTS = {
     ".md",
@@ -26,53 +41,259 @@ def is_text_file(path: Path) -> bool:
     return path.suffix.lower() in TEXT_EXTS
 
 
-def copy_dir(src: Path, dst: Path) -> None:
-    # Templates may be developed locally, and those working trees can contain
-    # build artifacts. Never copy heavy or generated directories into the
-    # rendered repos.
-    skip_names = {"node_modules", "dist", ".git", ".netlify", ".playwright-cli", "output"}
-    dst.mkdir(parents=True, exist_ok=True)
-    for p in src.iterdir():
-        if p.name in skip_names:
-            continue
-        out = dst / p.name
-        if p.is_dir():
-            shutil.copytree(
-                p,
-                out,
-                dirs_exist_ok=True,
-                ignore=shutil.ignore_patterns(
-                    "__pycache__",
-                    "*.pyc",
-                    "*.pyo",
-                    ".DS_Store",
-                    "Thumbs.db",
-                    "node_modules",
-                    "dist",
-                    ".netlify",
-                    ".playwright-cli",
-                    "output",
-                ),
-            )
+def _tmp_sibling(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".swm-tmp", dir=path.parent)
+    os.close(fd)
+    return Path(tmp)
+
+
+def _replace_from_tmp(tmp: Path, path: Path) -> None:
+    try:
+        if path.is_dir():
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_bytes(path: Path, data: bytes, mode_from: Path | None = None) -> None:
+    """
+    Write data to path via a temp file + rename, so a crash never leaves a
+    half-written file. Permission bits come from mode_from (e.g. the template),
+    else from the file being replaced, else 0o644.
+    """
+    tmp = _tmp_sibling(path)
+    try:
+        tmp.write_bytes(data)
+        if mode_from is None and path.is_file():
+            mode_from = path
+        if mode_from is not None:
+            shutil.copymode(mode_from, tmp)
         else:
-            shutil.copy2(p, out)
+            os.chmod(tmp, 0o644)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _replace_from_tmp(tmp, path)
 
 
-def replace_placeholders_in_tree(root: Path, subs: dict[str, str]) -> None:
-    for p in root.rglob("*"):
-        if p.is_dir():
-            continue
-        if not is_text_file(p):
+def atomic_copy(src: Path, dst: Path) -> None:
+    """shutil.copy2 semantics (content, mode, mtime), published with an atomic rename."""
+    tmp = _tmp_sibling(dst)
+    try:
+        shutil.copy2(src, tmp)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _replace_from_tmp(tmp, dst)
+
+
+def _map_io(fn: Callable[[_T], _R], items: list[_T], jobs: int) -> list[_R]:
+    # File materialization is blocking I/O, so threads overlap it well.
+    if jobs <= 1 or len(items) < 2:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(fn, items))
+
+
+def _same_content(src: Path, src_st: os.stat_result, dst: Path) -> bool:
+    # rsync-style quick check: equal size and mtime means unchanged; otherwise
+    # compare content hashes before deciding to rewrite.
+    try:
+        dst_st = dst.stat()
+    except OSError:
+        return False
+    if not dst.is_file() or dst_st.st_size != src_st.st_size:
+        return False
+    if dst_st.st_mtime_ns == src_st.st_mtime_ns:
+        return True
+    if file_sha256(src) != file_sha256(dst):
+        return False
+    # Same bytes: align mtime so the next sync takes the quick path.
+    os.utime(dst, ns=(dst_st.st_atime_ns, src_st.st_mtime_ns))
+    return True
+
+
+def _remove_extras(dst: Path, keep: set[Path], skip_dirs: Iterable[str]) -> int:
+    # Unlink files under dst not listed in keep (relative paths), then prune
+    # directories left empty. Returns the number of files removed.
+    if not dst.is_dir():
+        return 0
+    removed = 0
+    for p in walk_files(dst, skip_dirs=skip_dirs, skip_files=()):
+        if p.relative_to(dst) not in keep:
+            p.unlink()
+            removed += 1
+    skip = frozenset(skip_dirs)
+    for cur, _, _ in os.walk(dst, topdown=False):
+        rel = Path(cur).relative_to(dst)
+        if not rel.parts or any(part in skip for part in rel.parts):
             continue
         try:
-            text = p.read_text(encoding="utf-8")
-        except Exception:
-            continue
-        changed = text
-        for k, v in subs.items():
-            changed = changed.replace(k, v)
-        if changed != text:
-            p.write_text(changed, encoding="utf-8")
+            os.rmdir(cur)  # Only succeeds once the directory is empty.
+        except OSError:
+            pass
+    return removed
+
+
+def sync_dir(
+    src: Path,
+    dst: Path,
+    skip_dirs: Iterable[str] = TEMPLATE_SKIP_DIRS,
+    jobs: int = RENDER_JOBS,
+) -> int:
+    """
+    Make dst mirror src (minus pruned entries), touching only what differs.
+
+    Unchanged files keep their inode and mtime, so git does not re-hash them.
+    Returns the number of files written or removed.
+    """
+    wanted = {p.relative_to(src): p for p in walk_files(src, skip_dirs)}
+
+    # Drop files that are gone from src first, so a stale file never blocks a
+    # directory of the same name (and vice versa).
+    touched = _remove_extras(dst, set(wanted), skip_dirs=())
+
+    def sync_one(item: tuple[Path, Path]) -> bool:
+        rel, p = item
+        out = dst / rel
+        if _same_content(p, p.stat(), out):
+            return False
+        atomic_copy(p, out)
+        return True
+
+    dst.mkdir(parents=True, exist_ok=True)
+    touched += sum(_map_io(sync_one, list(wanted.items()), jobs))
+    return touched
+
+
+class Placeholders:
+    """
+    Placeholder substitution compiled once per substitution set.
+
+    All keys are folded into one regex, so each text is scanned once rather
+    than once per key. Text without the shared "__" marker is returned
+    untouched without touching the regex engine.
+    """
+
+    def __init__(self, subs: dict[str, str]) -> None:
+        self.subs = dict(subs)
+        # Longest first, so a key that is a prefix of another never shadows it.
+        keys = sorted(self.subs, key=len, reverse=True)
+        self._rx = re.compile("|".join(re.escape(k) for k in keys)) if keys else None
+        self._marker = "__" if keys and all("__" in k for k in keys) else ""
+
+    def apply(self, text: str) -> tuple[str, bool]:
+        """Return (rendered text, whether anything was substituted)."""
+        if self._rx is None or (self._marker and self._marker not in text):
+            return text, False
+        out = self._rx.sub(lambda m: self.subs[m.group(0)], text)
+        return out, out != text
+
+
+def _render_bytes(src: Path, placeholders: Placeholders) -> tuple[str, bytes]:
+    # Returns (sha256 of the template, rendered output).
+    data = src.read_bytes()
+    src_sha = hashlib.sha256(data).hexdigest()
+    if not is_text_file(src):
+        return src_sha, data
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return src_sha, data
+    rendered, changed = placeholders.apply(text)
+    return src_sha, rendered.encode("utf-8") if changed else data
+
+
+def _manifest_hit(entry: Any, src_st: os.stat_result, out: Path) -> bool:
+    if not isinstance(entry, dict):
+        return False
+    if entry.get("src_size") != src_st.st_size or entry.get("src_mtime_ns") != src_st.st_mtime_ns:
+        return False
+    try:
+        out_st = out.stat()
+    except OSError:
+        return False
+    return entry.get("out_size") == out_st.st_size and entry.get("out_mtime_ns") == out_st.st_mtime_ns
+
+
+def render_tree(
+    src: Path,
+    dst: Path,
+    subs: dict[str, str],
+    manifest_path: Path,
+    skip_dirs: Iterable[str] = TEMPLATE_SKIP_DIRS,
+    jobs: int = RENDER_JOBS,
+    caller_owned: Iterable[str] = (),
+) -> int:
+    """
+    Render a template tree into a repo, rewriting only outputs that changed.
+
+    Equivalent to wiping dst (except .git), copying the template and
+    substituting placeholders, except that pruned build directories
+    (node_modules, dist, ...) in dst are left alone. The manifest records,
+    per file, the template stat + sha256, the substitution set hash and the
+    output stat + sha256. A file whose template, substitutions and on-disk
+    output all still match is skipped without being read. Files are rendered
+    on a bounded thread pool and written atomically.
+
+    caller_owned lists dst-relative POSIX paths that the caller writes itself
+    afterwards: they are neither rendered, removed nor recorded, so they are
+    written once per render instead of twice.
+
+    Returns the number of files written or removed.
+    """
+    placeholders = Placeholders(subs)
+    subs_hash = hashlib.sha256(json.dumps(subs, sort_keys=True).encode("utf-8")).hexdigest()
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        files = manifest["files"] if manifest.get("subs") == subs_hash else {}
+    except Exception:
+        files = {}
+    if not isinstance(files, dict):
+        files = {}
+
+    owned = {Path(rel) for rel in caller_owned}
+    wanted = {rel: p for rel, p in ((p.relative_to(src), p) for p in walk_files(src, skip_dirs)) if rel not in owned}
+    touched = _remove_extras(dst, set(wanted) | owned, skip_dirs={".git"} | set(skip_dirs))
+
+    def render_one(item: tuple[Path, Path]) -> tuple[str, Any, bool]:
+        rel, p = item
+        key = rel.as_posix()
+        out = dst / rel
+        src_st = p.stat()
+        entry = files.get(key)
+        if _manifest_hit(entry, src_st, out):
+            return key, entry, False
+
+        src_sha, rendered = _render_bytes(p, placeholders)
+        out_sha = hashlib.sha256(rendered).hexdigest()
+        wrote = False
+        if not (out.is_file() and out.stat().st_size == len(rendered) and file_sha256(out) == out_sha):
+            atomic_write_bytes(out, rendered, mode_from=p)
+            wrote = True
+        out_st = out.stat()
+        entry = {
+            "src_size": src_st.st_size,
+            "src_mtime_ns": src_st.st_mtime_ns,
+            "src_sha256": src_sha,
+            "out_size": out_st.st_size,
+            "out_mtime_ns": out_st.st_mtime_ns,
+            "out_sha256": out_sha,
+        }
+        return key, entry, wrote
+
+    fresh: dict[str, Any] = {}
+    for key, entry, wrote in _map_io(render_one, list(wanted.items()), jobs):
+        fresh[key] = entry
+        touched += int(wrote)
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest = {"subs": subs_hash, "files": fresh}
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return touched
 
 
 def wipe_repo_contents(repo_root: Path) -> None:
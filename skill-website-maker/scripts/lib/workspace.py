@@ -6,9 +6,12 @@ import time
 from pathlib import Path
 from typing import Any
 
+from .fswalk import SKILL_SKIP_DIRS
+
 STATE_DIR_REL = Path(".codex") / "skill-website-maker"
 WORKSPACE_MARKER = "workspace.json"
 PROJECT_CONFIG = "project.json"
+TRACE_LOG = "trace.jsonl"
 
 
 def state_dir(workspace_root: Path) -> Path:
@@ -23,6 +26,10 @@ def project_config_path(workspace_root: Path) -> Path:
     return state_dir(workspace_root) / PROJECT_CONFIG
 
 
+def trace_log_path(workspace_root: Path) -> Path:
+    return state_dir(workspace_root) / TRACE_LOG
+
+
 def find_workspace_root(start: Path) -> Path | None:
     cur = start.resolve()
     while True:
@@ -35,6 +42,29 @@ def find_workspace_root(start: Path) -> Path | None:
         cur = parent
 
 
+def find_workspaces(root: Path) -> list[Path]:
+    """
+    Every workspace under root (root included), in sorted order.
+
+    State dirs (and the repo clones inside them) and build directories are
+    pruned, so discovery stays cheap even when workspaces hold large clones.
+    """
+    skip = SKILL_SKIP_DIRS | {STATE_DIR_REL.parts[0]}
+    found: list[Path] = []
+    stack = [root.resolve()]
+    while stack:
+        cur = stack.pop()
+        if workspace_marker_path(cur).is_file():
+            found.append(cur)
+        try:
+            with os.scandir(cur) as it:
+                subdirs = sorted(e.path for e in it if e.name not in skip and e.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+        stack.extend(Path(d) for d in reversed(subdirs))
+    return found
+
+
 def require_workspace(start: Path) -> Path:
     ws = find_workspace_root(start)
     if ws is None:
@@ -2,25 +2,35 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import os
 import re
 import shutil
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 
-from lib.secret_scan import scan_dir
+from lib.doctor import DOCTOR_TOOLS, doctor_report
+from lib.fswalk import SKILL_SKIP_DIRS, TEMPLATE_SKIP_DIRS, file_sha256, tree_digest, walk_files
+from lib.github import RepoState, probe_github_state
+from lib.pipeline import Stage, run_stages
+from lib.secret_scan import pattern_set_version, scan_dir
 from lib.semver import is_semver
-from lib.subprocessx import CmdError, run
-from lib.templates import copy_dir, replace_placeholders_in_tree, wipe_repo_contents
+from lib.subprocessx import CmdError, configure_policies, enable_trace, run, run_streaming
+from lib.templates import Placeholders, render_tree, sync_dir, wipe_repo_contents
 from lib.workspace import (
+    find_workspace_root,
+    find_workspaces,
     init_workspace,
     load_json,
     project_config_path,
     require_workspace,
     save_json,
     state_dir,
+    trace_log_path,
     workspace_marker_path,
 )
 
@@ -59,19 +69,6 @@ def infer_skill_source(skill_slug: str) -> Path:
     return default_codex_home() / "skills" / skill_slug
 
 
-def tool_ok(name: str) -> bool:
-    return shutil.which(name) is not None
-
-
-def gh_active_login() -> str:
-    if not tool_ok("gh"):
-        return ""
-    cp = run(["gh", "api", "user", "-q", ".login"], check=False)
-    if cp.returncode != 0:
-        return ""
-    return cp.stdout.strip()
-
-
 def print_fix(tool: str) -> None:
     if tool == "git":
         print("Fix: install git (https://git-scm.com/downloads)")
@@ -88,12 +85,22 @@ def print_fix(tool: str) -> None:
     print(f"Fix: install {tool} and ensure it is on PATH")
 
 
-def cmd_doctor(_: argparse.Namespace) -> int:
+def _doctor_cache_path() -> Path | None:
+    ws_root = find_workspace_root(Path.cwd())
+    return state_dir(ws_root) / "cache" / "doctor.json" if ws_root is not None else None
+
+
+def cmd_doctor(args: argparse.Namespace) -> int:
     header("Skill Website Maker Doctor")
 
+    report = doctor_report(_doctor_cache_path(), refresh=args.refresh)
+    if report.cached:
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(report.checked_at))
+        print(f"(cached result from {stamp}; run: doctor --refresh to re-check)")
+
     ok = True
-    for tool in ["git", "gh", "node", "pnpm"]:
-        if tool_ok(tool):
+    for tool in DOCTOR_TOOLS:
+        if report.has(tool):
             print(f"OK: {tool} found")
         else:
             ok = False
@@ -101,15 +108,10 @@ def cmd_doctor(_: argparse.Namespace) -> int:
 
     print(f"OK: python {sys.version.split()[0]}")
 
-    if tool_ok("gh"):
-        try:
-            cp = run(["gh", "auth", "status"], check=False)
-            if cp.returncode == 0:
-                print("OK: gh auth status")
-            else:
-                ok = False
-                print("Fix: gh auth login")
-        except Exception:
+    if report.has("gh"):
+        if report.gh_auth_ok:
+            print("OK: gh auth status")
+        else:
             ok = False
             print("Fix: gh auth login")
 
@@ -170,8 +172,21 @@ def cmd_project_init(args: argparse.Namespace) -> int:
         "site_repo_private": True,
         "skill_repo_public": True,
         "netlify": {"site_name": "", "site_url": "", "linked": False},
+        "clone": {
+            "depth": max(0, args.clone_depth),
+            "filter": args.clone_filter.strip(),
+            "single_branch": bool(args.single_branch),
+            "shared_cache": bool(args.shared_clone_cache),
+        },
         "last_publish_at": "",
     }
+    # subprocess_policy is only ever hand-edited; keep it across re-inits.
+    try:
+        prev = load_json(cfg_path) if cfg_path.is_file() else {}
+    except Exception:
+        prev = {}
+    if isinstance(prev.get("subprocess_policy"), dict):
+        obj["subprocess_policy"] = prev["subprocess_policy"]
 
     save_json(cfg_path, obj)
     print("Project initialized.")
@@ -211,6 +226,12 @@ def cmd_project_status(_: argparse.Namespace) -> int:
     print(f"netlify.site_name: {netlify.get('site_name','')}")
     print(f"netlify.site_url: {netlify.get('site_url','')}")
     print(f"netlify.linked: {netlify.get('linked', False)}")
+    clone = clone_strategy(cfg)
+    print(f"clone.depth: {clone['depth'] or 'full'}")
+    print(f"clone.filter: {clone['filter']}")
+    print(f"clone.single_branch: {clone['single_branch']}")
+    print(f"clone.shared_cache: {shared_git_cache_root() if clone['shared_cache'] else False}")
+    print(f"subprocess_policy: {json.dumps(cfg.get('subprocess_policy') or {}, sort_keys=True)}")
     print(f"last_publish_at: {cfg.get('last_publish_at','')}")
     return 0
 
@@ -219,34 +240,114 @@ def gh_repo_full(owner: str, repo: str) -> str:
     return f"{owner}/{repo}"
 
 
-def ensure_repo_exists(owner: str, repo: str, private: bool, description: str) -> None:
+def ensure_repo_exists(
+    owner: str,
+    repo: str,
+    private: bool,
+    description: str,
+    known: RepoState | None = None,
+) -> None:
+    # known: state from probe_github_state(); None means ask gh directly.
     full = gh_repo_full(owner, repo)
-    cp = run(["gh", "repo", "view", full], check=False)
-    if cp.returncode == 0:
+    if known is None:
+        exists = run(["gh", "repo", "view", full], check=False).returncode == 0
+    else:
+        exists = known.exists
+    if exists:
         print(f"OK: repo exists: {full}")
+        if known is not None and known.private != private:
+            actual = "private" if known.private else "public"
+            print(f"Note: {full} is {actual}; expected {'private' if private else 'public'}.")
         return
 
     vis_flag = "--private" if private else "--public"
     print(f"Creating repo: {full} ({'private' if private else 'public'})")
-    run(
-        [
-            "gh",
-            "repo",
-            "create",
-            full,
-            vis_flag,
-            "--add-readme",
-            "--description",
-            description,
-            "--confirm",
-        ]
-    )
+    cmd = [
+        "gh",
+        "repo",
+        "create",
+        full,
+        vis_flag,
+        "--add-readme",
+        "--description",
+        description,
+        "--confirm",
+    ]
+    cp = run(cmd, check=False)
+    if cp.returncode != 0:
+        # Creates are not retried (see GH_CREATE_SUBCOMMANDS); one that timed
+        # out or got a 5xx may still have gone through.
+        if run(["gh", "repo", "view", full], check=False).returncode != 0:
+            raise CmdError(cmd, cp.returncode, cp.stdout or "", cp.stderr or "")
+        print(f"OK: repo exists: {full}")
+
+
+def clone_strategy(cfg: dict[str, Any]) -> dict[str, Any]:
+    # project.json "clone": {"depth": 0, "filter": "", "single_branch": false, "shared_cache": false}
+    raw = cfg.get("clone") if isinstance(cfg.get("clone"), dict) else {}
+    return {
+        "depth": max(0, int(raw.get("depth") or 0)),
+        "filter": str(raw.get("filter") or "").strip(),
+        "single_branch": bool(raw.get("single_branch", False)),
+        "shared_cache": bool(raw.get("shared_cache", False)),
+    }
+
+
+def shared_git_cache_root() -> Path:
+    env = os.environ.get("SWM_GIT_CACHE", "").strip()
+    if env:
+        return Path(env).expanduser()
+    return default_codex_home() / "skill-website-maker" / "git-cache"
 
 
-def ensure_clone(owner: str, repo: str, dest: Path) -> None:
+def pin_mirror_objects(mirror: Path) -> None:
+    # Workspace clones borrow objects from the mirror via alternates, and the
+    # mirror cannot see their refs. After an upstream force-push or branch
+    # delete, `fetch --prune` leaves those objects unreachable in the mirror,
+    # and a gc would delete them from under every clone. So never gc
+    # automatically, and never prune unreachable objects, even on a manual gc.
+    run(["git", "config", "gc.auto", "0"], cwd=mirror, check=False)
+    run(["git", "config", "gc.pruneExpire", "never"], cwd=mirror, check=False)
+
+
+def ensure_shared_mirror(owner: str, repo: str) -> Path:
+    """
+    Create or refresh the machine-wide bare mirror used as a clone reference.
+
+    Best effort: a failed refresh (e.g. another workspace fetching at the same
+    time) only means the next clone borrows fewer objects. The mirror only
+    grows; see pin_mirror_objects.
+    """
+    full = gh_repo_full(owner, repo)
+    mirror = shared_git_cache_root() / owner / f"{repo}.git"
+    if (mirror / "HEAD").is_file():
+        # Also covers mirrors seeded before the gc settings existed.
+        pin_mirror_objects(mirror)
+        run(["git", "fetch", "--prune", "origin"], cwd=mirror, check=False)
+    else:
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        print(f"Seeding shared git cache: {full} -> {mirror}")
+        run(
+            ["gh", "repo", "clone", full, str(mirror), "--", "--mirror"],
+            check=False,
+            before_retry=lambda: shutil.rmtree(mirror, ignore_errors=True),
+        )
+        if (mirror / "HEAD").is_file():
+            pin_mirror_objects(mirror)
+    return mirror
+
+
+def ensure_clone(owner: str, repo: str, dest: Path, strategy: dict[str, Any] | None = None) -> None:
     full = gh_repo_full(owner, repo)
+    strategy = strategy or {}
+    depth = int(strategy.get("depth") or 0)
     if dest.is_dir() and (dest / ".git").is_dir():
-        run(["git", "fetch", "--all", "--prune"], cwd=dest)
+        if depth:
+            # Keep shallow clones shallow; the partial-clone filter is
+            # remembered in the clone's config and applies automatically.
+            run(["git", "fetch", "--prune", f"--depth={depth}", "origin"], cwd=dest)
+        else:
+            run(["git", "fetch", "--all", "--prune"], cwd=dest)
         # Best effort sync main.
         run(["git", "checkout", "main"], cwd=dest, check=False)
         run(["git", "pull", "--ff-only"], cwd=dest, check=False)
@@ -255,9 +356,26 @@ def ensure_clone(owner: str, repo: str, dest: Path) -> None:
     if dest.exists():
         fail(f"destination exists but is not a git repo: {dest}")
 
+    git_args: list[str] = []
+    if depth:
+        git_args.append(f"--depth={depth}")
+    if strategy.get("filter"):
+        git_args.append(f"--filter={strategy['filter']}")
+    if strategy.get("single_branch"):
+        git_args += ["--single-branch", "--branch", "main"]
+    if strategy.get("shared_cache"):
+        # Borrow objects from the shared mirror via alternates instead of
+        # downloading (and storing) them again for every workspace.
+        git_args += ["--reference-if-able", str(ensure_shared_mirror(owner, repo))]
+
     dest.parent.mkdir(parents=True, exist_ok=True)
     print(f"Cloning: {full} -> {dest}")
-    run(["gh", "repo", "clone", full, str(dest)])
+    cmd = ["gh", "repo", "clone", full, str(dest)]
+    if git_args:
+        cmd += ["--"] + git_args
+    # A timed-out clone is SIGKILLed, so git cannot remove its half-written
+    # dest; clear it or the retry fails with "destination path already exists".
+    run_streaming(cmd, prefix=f"  [{repo}] ", timed=True, before_retry=lambda: shutil.rmtree(dest, ignore_errors=True))
 
 
 def ensure_git_identity(repo_root: Path) -> None:
@@ -307,15 +425,10 @@ def render_skill_repo(
     if blankish:
         wipe_repo_contents(repo_root)
 
-    # Copy skill folder into repo root (replace existing folder on updates).
+    # Mirror the skill folder into the repo root, rewriting only changed files.
+    # Same pruning as the secret scan, so only scanned files get published.
     dest_skill_dir = repo_root / skill_slug
-    if dest_skill_dir.exists():
-        shutil.rmtree(dest_skill_dir)
-    shutil.copytree(
-        source_dir,
-        dest_skill_dir,
-        ignore=shutil.ignore_patterns("__pycache__", "*.pyc", "*.pyo", ".DS_Store", "Thumbs.db", "node_modules", "dist"),
-    )
+    sync_dir(source_dir, dest_skill_dir, skip_dirs=SKILL_SKIP_DIRS)
 
     version_path = dest_skill_dir / "VERSION"
     if version_path.is_file():
@@ -336,14 +449,13 @@ def render_skill_repo(
         "__DATE__": time.strftime("%Y-%m-%d", time.gmtime()),
         "__YEAR__": time.strftime("%Y", time.gmtime()),
     }
+    placeholders = Placeholders(subs)
 
     def render_root_doc(name: str) -> str:
         src = skill_tmpl / name
         if not src.is_file():
             fail(f"missing template file: {src}")
-        text = src.read_text(encoding="utf-8")
-        for k, v in subs.items():
-            text = text.replace(k, v)
+        text, _ = placeholders.apply(src.read_text(encoding="utf-8"))
         return text
 
     root_docs = ["README.md", "CHANGELOG.md", "LICENSE", ".gitignore"]
@@ -384,9 +496,18 @@ def render_skill_repo(
     return version
 
 
-def ensure_tag_and_release(owner: str, repo: str, repo_root: Path, version: str, notes_path: Path | None) -> None:
-    # Tag
+def ensure_tag_and_release(
+    owner: str,
+    repo: str,
+    repo_root: Path,
+    version: str,
+    notes_path: Path | None,
+    release_known: bool | None = None,
+) -> None:
+    # Tag. Shallow clones may not carry every tag locally, so ask the remote too.
     tags = run(["git", "tag", "--list", version], cwd=repo_root).stdout.strip()
+    if not tags and (repo_root / ".git" / "shallow").is_file():
+        tags = run(["git", "ls-remote", "--tags", "origin", f"refs/tags/{version}"], cwd=repo_root).stdout.strip()
     if tags:
         print(f"OK: tag exists: {version}")
     else:
@@ -395,8 +516,9 @@ def ensure_tag_and_release(owner: str, repo: str, repo_root: Path, version: str,
         run(["git", "push", "origin", version], cwd=repo_root)
 
     full = gh_repo_full(owner, repo)
-    cp = run(["gh", "release", "view", version, "-R", full], check=False)
-    if cp.returncode == 0:
+    if release_known is None:
+        release_known = run(["gh", "release", "view", version, "-R", full], check=False).returncode == 0
+    if release_known:
         print(f"OK: release exists: {version}")
         return
 
@@ -406,7 +528,12 @@ def ensure_tag_and_release(owner: str, repo: str, repo_root: Path, version: str,
         cmd += ["--notes-file", str(notes_path)]
     else:
         cmd += ["--notes", f"Release {version}"]
-    run(cmd)
+    cp = run(cmd, check=False)
+    if cp.returncode != 0:
+        # Same as in ensure_repo_exists: check before treating it as a failure.
+        if run(["gh", "release", "view", version, "-R", full], check=False).returncode != 0:
+            raise CmdError(cmd, cp.returncode, cp.stdout or "", cp.stderr or "")
+        print(f"OK: release exists: {version}")
 
 
 def render_site_repo(
@@ -422,9 +549,6 @@ def render_site_repo(
     skill_repo = str(cfg["skill_repo"])
 
     site_tmpl = templates_root / "site-repo"
-    wipe_repo_contents(repo_root)
-    copy_dir(site_tmpl, repo_root)
-
     subs = {
         "__SKILL_SLUG__": skill_slug,
         "__SKILL_DISPLAY_NAME__": display_name,
@@ -432,7 +556,11 @@ def render_site_repo(
         "__SKILL_REPO__": skill_repo,
         "__VERSION__": version,
     }
-    replace_placeholders_in_tree(repo_root, subs)
+    # Same result as wipe + copy + substitute, but only rewrites outputs whose
+    # template or substitutions changed since the last render.
+    manifest_path = state_dir(ws_root) / "cache" / f"render-{repo_root.name}.json"
+    generated = ["client/public/skill-version.txt", "client/public/changelog.md", ".swm-generated"]
+    render_tree(site_tmpl, repo_root, subs, manifest_path, caller_owned=generated)
 
     # Ensure these always exist.
     write_text(repo_root / "client" / "public" / "skill-version.txt", version + "\n")
@@ -485,14 +613,13 @@ def update_site_artifacts(
     }
 
     site_tmpl = templates_root / "site-repo"
+    placeholders = Placeholders(subs)
 
     def render_file(rel: str) -> None:
         src = site_tmpl / rel
         if not src.is_file():
             fail(f"missing site template file: {src}")
-        text = src.read_text(encoding="utf-8")
-        for k, v in subs.items():
-            text = text.replace(k, v)
+        text, _ = placeholders.apply(src.read_text(encoding="utf-8"))
         write_text(repo_root / rel, text)
 
     # Installers
@@ -523,6 +650,98 @@ def update_site_artifacts(
     write_text(repo_root / "client" / "public" / "changelog.md", seed)
 
 
+# Site files that publish rewrites but that cannot change the outcome of
+# `pnpm check` / `pnpm build` (static files vite copies verbatim, CI config).
+SITE_BUILD_IGNORED = {
+    "client/public/install.sh",
+    "client/public/install.ps1",
+    "client/public/changelog.md",
+    "client/public/skill-version.txt",
+}
+
+
+def site_build_key(site_local: Path, tool_fingerprint: dict[str, Any]) -> str:
+    """
+    Digest of everything that decides whether the site build check passes:
+    lockfile, package.json and every other source file (minus SITE_BUILD_IGNORED
+    and .github), plus the node/pnpm executables from the doctor fingerprint.
+    """
+    h = hashlib.sha256()
+    tools = dict(tool_fingerprint.get("tools") or {})
+    h.update(json.dumps({k: tools.get(k) for k in ("node", "pnpm")}, sort_keys=True).encode("utf-8"))
+    for p in walk_files(site_local, TEMPLATE_SKIP_DIRS | {".github"}):
+        rel = p.relative_to(site_local).as_posix()
+        if rel in SITE_BUILD_IGNORED:
+            continue
+        h.update(rel.encode("utf-8") + b"\0" + file_sha256(p).encode("ascii") + b"\n")
+    return h.hexdigest()
+
+
+def site_build_check(ws_root: Path, site_local: Path, tool_fingerprint: dict[str, Any]) -> None:
+    # Only green results are cached; a failing build is re-run every time.
+    cache_path = state_dir(ws_root) / "cache" / "site-build.json"
+    key = site_build_key(site_local, tool_fingerprint)
+    try:
+        cached = load_json(cache_path)
+    except Exception:
+        cached = {}
+    if cached.get("key") == key:
+        print(f"Inputs unchanged since the passing build at {cached.get('passed_at', '?')}; skipping pnpm.")
+        return
+
+    install = ["pnpm", "install", "--prefer-offline"]
+    if (site_local / "pnpm-lock.yaml").is_file():
+        install.insert(2, "--frozen-lockfile")
+    # Streamed, so long installs/builds show progress (and their output is
+    # already on screen if they fail).
+    try:
+        for cmd in (install, ["pnpm", "check"], ["pnpm", "build"]):
+            run_streaming(cmd, cwd=site_local, prefix="  [pnpm] ", timed=True)
+    except CmdError:
+        fail("website build failed")
+    save_json(cache_path, {"key": key, "passed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())})
+
+
+def publish_fingerprint(
+    cfg: dict[str, Any],
+    source_dir: Path,
+    templates_root: Path,
+    version: str,
+    digest_cache: Path | None = None,
+) -> dict[str, str]:
+    """
+    Everything a publish's output depends on, one digest per input.
+
+    Covers the skill source, the templates, this tool's own code, the project
+    settings (substitution values, repo names, clone options) and VERSION.
+    File hashes are reused from digest_cache when size and mtime are unchanged,
+    so a repeat publish only stats the trees.
+    """
+    prev: dict[str, Any] = {}
+    if digest_cache is not None:
+        try:
+            prev = dict(load_json(digest_cache).get("files") or {})
+        except Exception:
+            prev = {}
+    seen: dict[str, Any] = {}
+    settings = {k: v for k, v in cfg.items() if not k.startswith("last_publish")}
+    fingerprint = {
+        "source": tree_digest(source_dir, SKILL_SKIP_DIRS, prev=prev, seen=seen),
+        "templates": tree_digest(templates_root, TEMPLATE_SKIP_DIRS, prev=prev, seen=seen),
+        "tool": tree_digest(Path(__file__).resolve().parent, prev=prev, seen=seen),
+        "settings": hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest(),
+        "version": version,
+        "tool_version": TOOL_VERSION,
+        "secret_patterns": pattern_set_version(),
+    }
+    if digest_cache is not None and seen != prev:
+        try:
+            save_json(digest_cache, {"files": seen})
+        except OSError:
+            pass
+    return fingerprint
+
+
 def cmd_project_publish(args: argparse.Namespace) -> int:
     ws_root = require_workspace(Path.cwd())
     cfg_path = project_config_path(ws_root)
@@ -540,10 +759,40 @@ def cmd_project_publish(args: argparse.Namespace) -> int:
     if not skill_repo or not site_repo:
         fail("skill_repo/site_repo missing in project.json")
 
-    if not tool_ok("git") or not tool_ok("gh"):
+    # The release tag is the source VERSION (render_skill_repo defaults to 1.0.0).
+    source_dir = Path(str(cfg["skill_source_dir"]))
+    source_version_path = source_dir / "VERSION"
+    expected_version = "1.0.0"
+    if source_version_path.is_file():
+        expected_version = source_version_path.read_text(encoding="utf-8", errors="ignore").strip()
+
+    # Fast path: identical inputs would render identical repos, and git_commit_push
+    # would only find "No changes to commit" after a full clone/render/build.
+    templates_root = Path(__file__).resolve().parents[1] / "references" / "templates"
+    fingerprint = publish_fingerprint(
+        cfg,
+        source_dir,
+        templates_root,
+        expected_version,
+        digest_cache=state_dir(ws_root) / "cache" / "publish-digests.json",
+    )
+    last = cfg.get("last_publish_fingerprint")
+    if not args.force and last == fingerprint:
+        print(f"Nothing changed since the last publish ({cfg.get('last_publish_at', 'unknown time')}); skipping.")
+        print("Re-run with --force to publish anyway (e.g. if the repos were edited on GitHub).")
+        return 0
+    if isinstance(last, dict):
+        changed = sorted(k for k in fingerprint if last.get(k) != fingerprint[k])
+        print(f"Changed since last publish: {', '.join(changed) or 'none (--force)'}")
+
+    # Reuses the cached doctor result, so repeat publishes skip the probe subprocesses.
+    report = doctor_report(state_dir(ws_root) / "cache" / "doctor.json")
+    if not report.has("git") or not report.has("gh"):
         fail("missing git or gh. Run: python scripts/swm.py doctor")
 
-    active = gh_active_login()
+    # One GraphQL round trip instead of separate gh user/repo/release probes.
+    gh_state = probe_github_state(owner, [skill_repo, site_repo], releases=[(skill_repo, expected_version)])
+    active = gh_state.viewer_login if gh_state else report.gh_login
     if active:
         print(f"gh.active_user: {active}")
         if owner.lower() != active.lower():
@@ -551,9 +800,12 @@ def cmd_project_publish(args: argparse.Namespace) -> int:
             print(f"      If repo creation fails, run: gh auth switch -u {owner}")
 
     # Secret scan
-    source_dir = Path(str(cfg["skill_source_dir"]))
     header("Secret scan (source skill folder)")
-    findings = scan_dir(source_dir)
+    findings = scan_dir(
+        source_dir,
+        jobs=args.scan_jobs,
+        cache_path=state_dir(ws_root) / "cache" / "secret-scan.json",
+    )
     if findings:
         print("Findings:")
         for f in findings:
@@ -561,62 +813,97 @@ def cmd_project_publish(args: argparse.Namespace) -> int:
         fail("refusing to publish until findings are removed")
     print("OK: no blocked files/patterns detected")
 
-    templates_root = Path(__file__).resolve().parents[1] / "references" / "templates"
     repos_root = state_dir(ws_root) / "repos"
     repos_root.mkdir(parents=True, exist_ok=True)
 
-    # Skill repo (public)
-    ensure_repo_exists(
-        owner,
-        skill_repo,
-        private=False,
-        description=f"Codex skill repo for {cfg.get('skill_display_name', cfg.get('skill_slug',''))}",
-    )
-    skill_local = repos_root / f"{skill_repo}"
-    ensure_clone(owner, skill_repo, skill_local)
-    version = render_skill_repo(ws_root, cfg, templates_root, skill_local)
-    git_commit_push(skill_local, f"chore: publish {cfg.get('skill_slug','skill')} v{version}")
-    ensure_tag_and_release(owner, skill_repo, skill_local, version, notes_path=None)
+    # Build checks need pnpm + node; check before touching any repo.
+    if not report.has("pnpm"):
+        fail("pnpm not found. Install: npm install -g pnpm")
+    if not report.has("node"):
+        fail("node not found. Install Node.js LTS")
 
-    # Site repo (private)
-    ensure_repo_exists(
-        owner,
-        site_repo,
-        private=True,
-        description=f"Website for Codex skill {cfg.get('skill_display_name', cfg.get('skill_slug',''))}",
-    )
+    skill_local = repos_root / f"{skill_repo}"
     site_local = repos_root / f"{site_repo}"
-    ensure_clone(owner, site_repo, site_local)
+    display = cfg.get("skill_display_name", cfg.get("skill_slug", ""))
+    slug = cfg.get("skill_slug", "skill")
+    # Written by skill-render, read by later stages.
+    version = ""
+
+    def skill_repo_stage() -> None:
+        ensure_repo_exists(
+            owner,
+            skill_repo,
+            private=False,
+            description=f"Codex skill repo for {display}",
+            known=gh_state.repo(skill_repo) if gh_state else None,
+        )
+
+    def skill_clone_stage() -> None:
+        ensure_clone(owner, skill_repo, skill_local, clone_strategy(cfg))
+
+    def skill_render_stage() -> None:
+        nonlocal version
+        version = render_skill_repo(ws_root, cfg, templates_root, skill_local)
+
+    def skill_push_stage() -> None:
+        git_commit_push(skill_local, f"chore: publish {slug} v{version}")
+
+    def skill_release_stage() -> None:
+        known = gh_state.release_exists(skill_repo, version) if gh_state else None
+        ensure_tag_and_release(owner, skill_repo, skill_local, version, notes_path=None, release_known=known)
+
+    def site_repo_stage() -> None:
+        ensure_repo_exists(
+            owner,
+            site_repo,
+            private=True,
+            description=f"Website for Codex skill {display}",
+            known=gh_state.repo(site_repo) if gh_state else None,
+        )
+
+    def site_clone_stage() -> None:
+        ensure_clone(owner, site_repo, site_local, clone_strategy(cfg))
+
+    def site_render_stage() -> None:
+        # Only fully render the site template into a blank repo. If the repo already
+        # has content, update only installers/workflows/links to avoid clobbering
+        # customizations.
+        non_git = [p for p in site_local.iterdir() if p.name != ".git"]
+        blankish = all(p.name in {"README.md", "LICENSE", ".gitignore"} for p in non_git)
+        if blankish:
+            render_site_repo(ws_root, cfg, templates_root, site_local, version)
+        else:
+            update_site_artifacts(ws_root, cfg, templates_root, site_local, version)
 
-    # Only fully render the site template into a blank repo. If the repo already
-    # has content, update only installers/workflows/links to avoid clobbering
-    # customizations.
-    non_git = [p for p in site_local.iterdir() if p.name != ".git"]
-    blankish = all(p.name in {"README.md", "LICENSE", ".gitignore"} for p in non_git)
-    if blankish:
-        render_site_repo(ws_root, cfg, templates_root, site_local, version)
-    else:
-        update_site_artifacts(ws_root, cfg, templates_root, site_local, version)
+    def site_build_stage() -> None:
+        header("Website build check")
+        site_build_check(ws_root, site_local, report.fingerprint)
 
-    # Build checks (requires pnpm)
-    if not tool_ok("pnpm"):
-        fail("pnpm not found. Install: npm install -g pnpm")
-    if not tool_ok("node"):
-        fail("node not found. Install Node.js LTS")
+    def site_push_stage() -> None:
+        git_commit_push(site_local, f"chore: render website template for {slug} v{version}")
 
-    header("Website build check")
-    try:
-        run(["pnpm", "install"], cwd=site_local)
-        run(["pnpm", "check"], cwd=site_local)
-        run(["pnpm", "build"], cwd=site_local)
-    except CmdError as e:
-        eprint(e.stdout)
-        eprint(e.stderr)
-        fail("website build failed")
-
-    git_commit_push(site_local, f"chore: render website template for {cfg.get('skill_slug','skill')} v{version}")
+    # Skill and site work overlap; edges keep the orderings that matter:
+    # the site render needs the skill VERSION and seeds its changelog from the
+    # skill clone, and the site only goes live once the skill release exists.
+    run_stages(
+        [
+            # Listed in the historical serial order, which --stage-jobs 1 reproduces.
+            Stage("skill-repo", skill_repo_stage),
+            Stage("skill-clone", skill_clone_stage, ("skill-repo",)),
+            Stage("skill-render", skill_render_stage, ("skill-clone",)),
+            Stage("skill-push", skill_push_stage, ("skill-render",)),
+            Stage("skill-release", skill_release_stage, ("skill-push",)),
+            Stage("site-repo", site_repo_stage),
+            Stage("site-clone", site_clone_stage, ("site-repo",)),
+            Stage("site-render", site_render_stage, ("site-clone", "skill-render")),
+            Stage("site-build", site_build_stage, ("site-render",)),
+            Stage("site-push", site_push_stage, ("site-build", "skill-release")),
+        ],
+        jobs=args.stage_jobs,
+    )
 
     cfg["last_publish_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    cfg["last_publish_fingerprint"] = fingerprint
     save_json(cfg_path, cfg)
 
     print("Publish complete.")
@@ -643,7 +930,7 @@ def cmd_project_update_site(args: argparse.Namespace) -> int:
 
     repos_root = state_dir(ws_root) / "repos"
     site_local = repos_root / site_repo
-    ensure_clone(owner, site_repo, site_local)
+    ensure_clone(owner, site_repo, site_local, clone_strategy(cfg))
 
     # Infer current version from the skill repo clone if available.
     version = "1.0.0"
@@ -680,7 +967,7 @@ def cmd_project_release(args: argparse.Namespace) -> int:
 
     repos_root = state_dir(ws_root) / "repos"
     skill_local = repos_root / skill_repo
-    ensure_clone(owner, skill_repo, skill_local)
+    ensure_clone(owner, skill_repo, skill_local, clone_strategy(cfg))
 
     version_path = skill_local / skill_slug / "VERSION"
     if not version_path.is_file():
@@ -694,11 +981,148 @@ def cmd_project_release(args: argparse.Namespace) -> int:
     return 0
 
 
+FLEET_ACTIONS = ("publish", "update-site", "release")
+
+
+def _fleet_run_one(ws_root: Path, action: str, trace: bool, stamp: str) -> tuple[int, float, Path]:
+    # Each workspace runs in its own swm.py process, so a failure (SystemExit
+    # from fail()) stays contained and its output lands in that project's log.
+    # -u: unbuffered, so the log fills in as the project runs.
+    cmd = [sys.executable, "-u", str(Path(__file__).resolve())]
+    if trace:
+        cmd.append("--trace")
+    cmd += ["project", action, "--confirm"]
+    log_path = state_dir(ws_root) / "logs" / f"fleet-{stamp}-{action}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    try:
+        # Written to the log as it happens, so a slow project can be followed live.
+        code = run_streaming(cmd, cwd=ws_root, check=False, echo=False, log_path=log_path).returncode
+    except OSError as e:
+        code = 1
+        with log_path.open("a", encoding="utf-8") as f:
+            f.write(f"{e}\n")
+    wall = time.perf_counter() - t0
+    with log_path.open("a", encoding="utf-8") as f:
+        f.write(f"\nexit={code} wall={wall:.1f}s\n")
+    return code, wall, log_path
+
+
+def cmd_fleet_publish(args: argparse.Namespace) -> int:
+    if not args.confirm:
+        fail(f"refusing to run fleet {args.action} without --confirm")
+    root = Path(args.root).expanduser().resolve()
+    if not root.is_dir():
+        fail(f"not a directory: {root}")
+
+    workspaces = [ws for ws in find_workspaces(root) if project_config_path(ws).is_file()]
+    if not workspaces:
+        print(f"No initialized projects found under: {root}")
+        return 0
+
+    jobs = max(1, args.jobs)
+    stamp = utc_stamp()
+    header(f"Fleet {args.action}: {len(workspaces)} project(s), {jobs} at a time")
+    results: dict[Path, tuple[int, float, Path]] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futs = {pool.submit(_fleet_run_one, ws, args.action, bool(args.trace), stamp): ws for ws in workspaces}
+        for fut in as_completed(futs):
+            ws = futs[fut]
+            results[ws] = fut.result()
+            code, wall, _ = results[ws]
+            print(f"  [{len(results)}/{len(workspaces)}] {'ok' if code == 0 else 'FAILED'}  {wall:.1f}s  {ws}")
+
+    def name(ws: Path) -> str:
+        return "." if ws == root else ws.relative_to(root).as_posix()
+
+    width = max([len("project")] + [len(name(ws)) for ws in workspaces])
+    print("")
+    print(f"  {'project':<{width}}  {'outcome':<10} {'duration':>9}  log")
+    for ws in workspaces:
+        code, wall, log_path = results[ws]
+        outcome = "ok" if code == 0 else f"exit {code}"
+        print(f"  {name(ws):<{width}}  {outcome:<10} {wall:8.1f}s  {log_path}")
+
+    failed = sum(1 for code, _, _ in results.values() if code != 0)
+    print("")
+    print(f"Done: {len(workspaces) - failed} ok, {failed} failed.")
+    return 1 if failed else 0
+
+
+def _format_bytes(n: int) -> str:
+    size = float(n)
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def cmd_trace_report(args: argparse.Namespace) -> int:
+    ws_root = require_workspace(Path.cwd())
+    path = trace_log_path(ws_root)
+    if not path.is_file():
+        print("No trace recorded yet. Re-run with: python <skillDir>/scripts/swm.py --trace project publish --confirm")
+        return 0
+
+    records: list[dict[str, Any]] = []
+    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(rec, dict):
+            records.append(rec)
+    if not records:
+        print(f"Trace is empty: {path}")
+        return 0
+
+    session = ""
+    if not args.all:
+        session = str(records[-1].get("session") or "")
+        records = [r for r in records if str(r.get("session") or "") == session]
+
+    def wall(r: dict[str, Any]) -> float:
+        return float(r.get("wall_sec") or 0.0)
+
+    def label(r: dict[str, Any]) -> str:
+        return f"{r.get('argv0', '')} {r.get('subcommand', '')}".strip()
+
+    header("Skill Website Maker Trace Report")
+    print(f"Trace: {path}")
+    print(f"Session: {session or 'all'}")
+    print(f"Commands: {len(records)}  Total: {sum(wall(r) for r in records):.2f}s")
+
+    print("")
+    print(f"Slowest commands (top {args.top}):")
+    for r in sorted(records, key=wall, reverse=True)[: args.top]:
+        print(
+            f"  {wall(r):8.2f}s  {label(r):<24} exit={r.get('returncode', '')}"
+            f"  out={_format_bytes(int(r.get('output_bytes') or 0))}  cwd={r.get('cwd', '')}"
+        )
+
+    totals: dict[str, list[float]] = {}
+    for r in records:
+        totals.setdefault(label(r), []).append(wall(r))
+    print("")
+    print("By command:")
+    for name, times in sorted(totals.items(), key=lambda kv: sum(kv[1]), reverse=True):
+        print(f"  {sum(times):8.2f}s  {name:<24} calls={len(times)}  max={max(times):.2f}s")
+    return 0
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="swm", description="Skill Website Maker (publish skills to GitHub + Netlify-ready site)")
+    p.add_argument(
+        "--trace",
+        action="store_true",
+        help="Record timing of every git/gh/pnpm call to the workspace trace log (or set SWM_TRACE=1)",
+    )
     sub = p.add_subparsers(dest="cmd", required=True)
 
-    sub.add_parser("doctor", help="Check dependencies (git/gh/node/pnpm) and gh auth").set_defaults(fn=cmd_doctor)
+    dr = sub.add_parser("doctor", help="Check dependencies (git/gh/node/pnpm) and gh auth")
+    dr.add_argument("--refresh", action="store_true", help="Ignore the cached result and re-run every check")
+    dr.set_defaults(fn=cmd_doctor)
 
     ws = sub.add_parser("workspace", help="Workspace management")
     ws_sub = ws.add_subparsers(dest="ws_cmd", required=True)
@@ -716,12 +1140,34 @@ def build_parser() -> argparse.ArgumentParser:
     pi.add_argument("--owner", default="", help="GitHub owner/org for repos (required before publish)")
     pi.add_argument("--skill-repo", default="", help="Skill repo name (default: <skill_slug>-skill)")
     pi.add_argument("--site-repo", default="", help="Website repo name (default: <skill_slug>)")
+    pi.add_argument("--clone-depth", type=int, default=0, help="Shallow-clone repos to this depth (default: 0 = full history)")
+    pi.add_argument("--clone-filter", default="", help="Partial-clone filter for repo clones, e.g. blob:none")
+    pi.add_argument("--single-branch", action="store_true", help="Clone only the main branch")
+    pi.add_argument(
+        "--shared-clone-cache",
+        action="store_true",
+        help="Share git objects across workspaces via a mirror under CODEX_HOME (or SWM_GIT_CACHE); "
+        "clones depend on that cache, so do not delete it while workspaces use it",
+    )
     pi.set_defaults(fn=cmd_project_init)
 
     proj_sub.add_parser("status", help="Show saved project config").set_defaults(fn=cmd_project_status)
 
     pp = proj_sub.add_parser("publish", help="Create/update repos and publish (requires --confirm)")
     pp.add_argument("--confirm", action="store_true", help="Required safety gate for publishing")
+    pp.add_argument(
+        "--scan-jobs",
+        type=int,
+        default=1,
+        help="Worker processes for the secret scan (default: 1; 0 = one per CPU)",
+    )
+    pp.add_argument(
+        "--stage-jobs",
+        type=int,
+        default=4,
+        help="Independent publish stages to run concurrently (default: 4; 1 = strict sequence)",
+    )
+    pp.add_argument("--force", action="store_true", help="Publish even if nothing changed since the last publish")
     pp.set_defaults(fn=cmd_project_publish)
 
     pu = proj_sub.add_parser("update-site", help="Update only the website repo from templates (requires --confirm)")
@@ -732,12 +1178,41 @@ def build_parser() -> argparse.ArgumentParser:
     pr.add_argument("--confirm", action="store_true", help="Required safety gate for releasing")
     pr.set_defaults(fn=cmd_project_release)
 
+    fl = sub.add_parser("fleet", help="Run a project command across many workspaces")
+    fl_sub = fl.add_subparsers(dest="fleet_cmd", required=True)
+    flp = fl_sub.add_parser("publish", help="Publish every initialized project under a directory (requires --confirm)")
+    flp.add_argument("--root", default=".", help="Directory to search for workspaces (default: current folder)")
+    flp.add_argument("--jobs", type=int, default=4, help="Projects to run concurrently (default: 4)")
+    flp.add_argument(
+        "--action",
+        choices=FLEET_ACTIONS,
+        default="publish",
+        help="Project command to run in each workspace (default: publish)",
+    )
+    flp.add_argument("--confirm", action="store_true", help="Required safety gate; passed on to each project command")
+    flp.set_defaults(fn=cmd_fleet_publish)
+
+    tr = sub.add_parser("trace", help="Inspect subprocess timing traces")
+    tr_sub = tr.add_subparsers(dest="trace_cmd", required=True)
+    trr = tr_sub.add_parser("report", help="Summarize the slowest steps of the last traced run")
+    trr.add_argument("--top", type=int, default=10, help="How many slow commands to list (default: 10)")
+    trr.add_argument("--all", action="store_true", help="Summarize every recorded run, not just the last one")
+    trr.set_defaults(fn=cmd_trace_report)
+
     return p
 
 
 def main(argv: list[str]) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    ws_root = find_workspace_root(Path.cwd())
+    if ws_root is not None and (args.trace or os.environ.get("SWM_TRACE", "").strip() not in {"", "0"}):
+        enable_trace(trace_log_path(ws_root), session=f"{utc_stamp()}-{os.getpid()}")
+    if ws_root is not None and project_config_path(ws_root).is_file():
+        try:
+            configure_policies(load_json(project_config_path(ws_root)).get("subprocess_policy"))
+        except (ValueError, TypeError, re.error) as e:
+            fail(f"invalid subprocess_policy in project.json: {e}")
     try:
         return int(args.fn(args))
     except CmdError as e:
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "skill-website-maker" / "scripts"))
+
+from lib.github import RepoState, probe_github_state  # noqa: E402
+
+# Stands in for gh: logs its argv, prints a canned response and exits with a canned code.
+FAKE_GH = """#!{python}
+import json, os, sys
+with open(os.environ["FAKE_GH_LOG"], "a", encoding="utf-8") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
+with open(os.environ["FAKE_GH_STDOUT"], encoding="utf-8") as f:
+    sys.stdout.write(f.read())
+sys.exit(int(os.environ.get("FAKE_GH_EXIT", "0")))
+"""
+
+
+@unittest.skipIf(os.name == "nt", "fake gh is a POSIX script")
+class ProbeGitHubStateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        bin_dir = self.tmp / "bin"
+        bin_dir.mkdir()
+        gh = bin_dir / "gh"
+        gh.write_text(FAKE_GH.format(python=sys.executable), encoding="utf-8")
+        gh.chmod(0o755)
+        self.log = self.tmp / "gh.log"
+        self.stdout = self.tmp / "gh.out"
+        env = {
+            "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            "FAKE_GH_LOG": str(self.log),
+            "FAKE_GH_STDOUT": str(self.stdout),
+            "FAKE_GH_EXIT": "0",
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def respond(self, payload: object, exit_code: int = 0) -> None:
+        text = payload if isinstance(payload, str) else json.dumps(payload)
+        self.stdout.write_text(text, encoding="utf-8")
+        os.environ["FAKE_GH_EXIT"] = str(exit_code)
+
+    def calls(self) -> list[list[str]]:
+        return [json.loads(line) for line in self.log.read_text(encoding="utf-8").splitlines()]
+
+    def test_partial_data_with_not_found(self) -> None:
+        # gh exits 1 when GraphQL returns errors next to partial data.
+        self.respond(
+            {
+                "data": {
+                    "viewer": {"login": "octo"},
+                    "r0": {"isPrivate": True, "t0": {"tagName": "v1.2.0"}},
+                    "r1": None,
+                },
+                "errors": [{"type": "NOT_FOUND", "path": ["r1"], "message": "Could not resolve to a Repository"}],
+            },
+            exit_code=1,
+        )
+        state = probe_github_state("octo", ["skill", "site", "skill"], releases=[("skill", "v1.2.0")])
+        assert state is not None
+        self.assertEqual(state.viewer_login, "octo")
+        self.assertEqual(state.repo("skill"), RepoState(exists=True, private=True))
+        self.assertEqual(state.repo("site"), RepoState(exists=False))
+        self.assertIs(state.release_exists("skill", "v1.2.0"), True)
+        self.assertIsNone(state.release_exists("site", "v1.2.0"))
+
+        # One call, with every name passed as a variable rather than inlined.
+        (argv,) = self.calls()
+        self.assertEqual(argv[:2], ["api", "graphql"])
+        self.assertIn("owner=octo", argv)
+        self.assertIn("r0=skill", argv)
+        self.assertIn("r1=site", argv)
+        self.assertIn("t0=v1.2.0", argv)
+        self.assertNotIn("r2=skill", argv)
+
+    def test_missing_release_and_unknown_repo(self) -> None:
+        self.respond(
+            {
+                "data": {"viewer": {"login": "octo"}, "r0": {"isPrivate": False, "t0": None}, "r1": None},
+                "errors": [{"type": "FORBIDDEN", "path": ["r1"]}],
+            },
+            exit_code=1,
+        )
+        state = probe_github_state("octo", ["skill", "site"], releases=[("skill", "v2.0.0"), ("site", "v2.0.0")])
+        assert state is not None
+        self.assertEqual(state.repo("skill"), RepoState(exists=True, private=False))
+        self.assertIs(state.release_exists("skill", "v2.0.0"), False)
+        # Not NOT_FOUND: unknown, so callers ask gh directly.
+        self.assertIsNone(state.repo("site"))
+        self.assertIsNone(state.release_exists("site", "v2.0.0"))
+
+    def test_release_on_missing_repo_is_false(self) -> None:
+        self.respond(
+            {
+                "data": {"viewer": {"login": "octo"}, "r0": None},
+                "errors": [{"type": "NOT_FOUND", "path": ["r0"]}],
+            },
+            exit_code=1,
+        )
+        state = probe_github_state("octo", ["skill"], releases=[("skill", "v1.0.0")])
+        assert state is not None
+        self.assertEqual(state.repo("skill"), RepoState(exists=False))
+        self.assertIs(state.release_exists("skill", "v1.0.0"), False)
+
+    def test_bad_payload_returns_none(self) -> None:
+        for payload in ("", "not json", "[]", {"errors": [{"type": "NOT_FOUND"}]}, {"data": None}, {"data": []}):
+            with self.subTest(payload=payload):
+                self.respond(payload, exit_code=1)
+                self.assertIsNone(probe_github_state("octo", ["skill"]))
+
+    def test_gh_missing_returns_none(self) -> None:
+        with mock.patch.dict(os.environ, {"PATH": str(self.tmp / "empty")}):
+            self.assertIsNone(probe_github_state("octo", ["skill"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
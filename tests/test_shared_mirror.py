@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "skill-website-maker" / "scripts"))
+
+import swm  # noqa: E402
+
+# Stands in for `gh repo clone OWNER/REPO DEST -- GITARGS...`, cloning from local bare repos instead.
+FAKE_GH = """#!{python}
+import os, subprocess, sys
+args = sys.argv[1:]
+if args[:2] != ["repo", "clone"]:
+    sys.exit("fake gh: unsupported: " + " ".join(args))
+full, dest = args[2], args[3]
+extra = args[5:] if args[4:5] == ["--"] else []
+# file:// forces the network code path; a plain local path would hardlink objects instead.
+src = "file://" + os.path.join(os.environ["FAKE_GH_REMOTES"], full + ".git")
+sys.exit(subprocess.call(["git", "clone", *extra, src, dest]))
+"""
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Test",
+    "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test",
+    "GIT_COMMITTER_EMAIL": "test@example.com",
+    "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+def git(*args: str, cwd: Path) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+@unittest.skipIf(os.name == "nt", "fake gh is a POSIX script")
+class SharedMirrorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        bin_dir = self.tmp / "bin"
+        bin_dir.mkdir()
+        gh = bin_dir / "gh"
+        gh.write_text(FAKE_GH.format(python=sys.executable), encoding="utf-8")
+        gh.chmod(0o755)
+        home = self.tmp / "home"
+        home.mkdir()
+        env = dict(GIT_ENV)
+        env.update(
+            {
+                "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+                "HOME": str(home),
+                "FAKE_GH_REMOTES": str(self.tmp / "remotes"),
+                "SWM_GIT_CACHE": str(self.tmp / "git-cache"),
+            }
+        )
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Upstream: main plus a feature branch, pushed from a scratch working copy.
+        self.upstream = self.tmp / "remotes" / "octo" / "skill.git"
+        self.upstream.parent.mkdir(parents=True)
+        git("init", "-q", "--bare", "-b", "main", str(self.upstream), cwd=self.tmp)
+        self.work = self.tmp / "work"
+        git("init", "-q", "-b", "main", str(self.work), cwd=self.tmp)
+        git("remote", "add", "origin", str(self.upstream), cwd=self.work)
+        self.commit("one")
+        git("push", "-q", "origin", "main", cwd=self.work)
+        git("checkout", "-q", "-b", "feature", cwd=self.work)
+        self.commit("two")
+        git("push", "-q", "origin", "feature", cwd=self.work)
+
+    def commit(self, name: str) -> None:
+        (self.work / f"{name}.txt").write_text(name + "\n", encoding="utf-8")
+        git("add", "-A", cwd=self.work)
+        git("commit", "-q", "-m", name, cwd=self.work)
+
+    def clone(self, dest: Path) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            swm.ensure_clone("octo", "skill", dest, {"shared_cache": True})
+
+    def test_clone_borrows_objects_from_mirror(self) -> None:
+        dest = self.tmp / "ws" / "skill"
+        self.clone(dest)
+        mirror = self.tmp / "git-cache" / "octo" / "skill.git"
+        alternates = (dest / ".git" / "objects" / "info" / "alternates").read_text(encoding="utf-8")
+        self.assertEqual(Path(alternates.strip()).resolve(), (mirror / "objects").resolve())
+        self.assertEqual(git("config", "gc.auto", cwd=mirror).strip(), "0")
+        self.assertEqual(git("config", "gc.pruneExpire", cwd=mirror).strip(), "never")
+
+    def test_upstream_rewrite_and_mirror_gc_keep_clones_intact(self) -> None:
+        dest = self.tmp / "ws" / "skill"
+        self.clone(dest)
+        head = git("rev-parse", "HEAD", cwd=dest).strip()
+
+        # Upstream rewrites main from scratch and deletes the feature branch.
+        git("checkout", "-q", "--orphan", "rewrite", cwd=self.work)
+        git("rm", "-rq", "--cached", ".", cwd=self.work)
+        self.commit("fresh")
+        git("push", "-q", "--force", "origin", "rewrite:main", ":feature", cwd=self.work)
+
+        # Next workspace refresh prunes the mirror; later, something runs gc on it.
+        with contextlib.redirect_stdout(io.StringIO()):
+            mirror = swm.ensure_shared_mirror("octo", "skill")
+        self.assertEqual(git("for-each-ref", "--format=%(refname)", "refs/heads", cwd=mirror).split(), ["refs/heads/main"])
+        # Age every object past gc's default two-week grace period.
+        old = time.time() - 60 * 24 * 3600
+        for p in (mirror / "objects").rglob("*"):
+            os.utime(p, (old, old))
+        git("gc", "--quiet", cwd=mirror)
+
+        # The workspace clone still resolves every object it borrowed.
+        fsck = subprocess.run(["git", "fsck", "--connectivity-only"], cwd=dest, capture_output=True, text=True)
+        self.assertEqual(fsck.returncode, 0, fsck.stdout + fsck.stderr)
+        self.assertEqual(git("log", "--format=%H", "-1", cwd=dest).strip(), head)
+        git("log", "origin/feature", cwd=dest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "skill-website-maker" / "scripts"))
+
+from lib.subprocessx import (  # noqa: E402
+    TIMEOUT_RETURNCODE,
+    CmdError,
+    command_class,
+    configure_policies,
+    run,
+    run_streaming,
+)
+
+# Stands in for gh: call n follows step n of the JSON plan (the last step repeats).
+# A step may print, sleep, exit with a code, and leave a grandchild running that
+# keeps appending to a file, as git does under `gh repo clone`.
+FAKE_GH = """#!{python}
+import json, os, subprocess, sys, time
+plan = json.load(open(os.environ["FAKE_GH_PLAN"], encoding="utf-8"))
+with open(os.environ["FAKE_GH_CALLS"], "a", encoding="utf-8") as f:
+    f.write(json.dumps(sys.argv[1:]) + "\\n")
+with open(os.environ["FAKE_GH_CALLS"], encoding="utf-8") as f:
+    n = sum(1 for _ in f)
+step = plan[min(n, len(plan)) - 1]
+if step.get("grandchild"):
+    subprocess.Popen(["sh", "-c", "while :; do echo x >> " + step["grandchild"] + "; sleep 0.05; done"])
+sys.stdout.write(step.get("out", ""))
+sys.stdout.flush()
+sys.stderr.write(step.get("err", ""))
+sys.stderr.flush()
+time.sleep(step.get("sleep", 0))
+sys.exit(step.get("exit", 0))
+"""
+
+FAST = {"timeout_sec": 0.5, "attempts": 3, "backoff_sec": 0}
+
+
+@unittest.skipIf(os.name == "nt", "fake gh is a POSIX script")
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        bin_dir = self.tmp / "bin"
+        bin_dir.mkdir()
+        gh = bin_dir / "gh"
+        gh.write_text(FAKE_GH.format(python=sys.executable), encoding="utf-8")
+        gh.chmod(0o755)
+        self.plan = self.tmp / "plan.json"
+        self.calls_path = self.tmp / "calls.jsonl"
+        env = {
+            "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            "FAKE_GH_PLAN": str(self.plan),
+            "FAKE_GH_CALLS": str(self.calls_path),
+        }
+        patcher = mock.patch.dict(os.environ, env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        configure_policies({"gh": FAST, "gh-create": {"timeout_sec": 0.5}, "git-network": FAST})
+        self.addCleanup(configure_policies, None)
+        # Retry notices go to stderr; keep the test output clean.
+        quiet = contextlib.redirect_stderr(io.StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def gh_plan(self, *steps: dict) -> None:
+        self.plan.write_text(json.dumps(list(steps)), encoding="utf-8")
+
+    def calls(self) -> int:
+        return len(self.calls_path.read_text(encoding="utf-8").splitlines()) if self.calls_path.exists() else 0
+
+    def run_both(self, cmd: list[str], **kwargs):
+        # Same scenario through run() and run_streaming(), each with a fresh call count.
+        for runner in (run, lambda c, **kw: run_streaming(c, echo=False, **kw)):
+            self.calls_path.unlink(missing_ok=True)
+            started = time.monotonic()
+            cp = runner(cmd, **kwargs)
+            yield cp, self.calls(), time.monotonic() - started
+
+    def test_recovers_after_5xx(self) -> None:
+        self.gh_plan({"err": "HTTP 502: Bad Gateway\n", "exit": 1}, {"out": "ok\n"})
+        for cp, calls, _ in self.run_both(["gh", "api", "user"]):
+            self.assertEqual(cp.returncode, 0)
+            self.assertIn("ok", cp.stdout)
+            self.assertEqual(calls, 2)
+
+    def test_gives_up_after_attempts(self) -> None:
+        self.gh_plan({"err": "HTTP 503: Service Unavailable\n", "exit": 1})
+        for cp, calls, _ in self.run_both(["gh", "api", "user"], check=False):
+            self.assertEqual(cp.returncode, 1)
+            self.assertEqual(calls, 3)
+        self.calls_path.unlink()
+        with self.assertRaises(CmdError):
+            run(["gh", "api", "user"])
+        self.assertEqual(self.calls(), 3)
+
+    def test_no_retry_on_404(self) -> None:
+        self.gh_plan({"err": "HTTP 404: Not Found\n", "exit": 1})
+        for cp, calls, _ in self.run_both(["gh", "api", "repos/o/missing"], check=False):
+            self.assertEqual(cp.returncode, 1)
+            self.assertEqual(calls, 1)
+
+    def test_before_retry_runs_between_attempts(self) -> None:
+        self.gh_plan({"err": "HTTP 500\n", "exit": 1}, {"err": "HTTP 500\n", "exit": 1}, {})
+        seen: list[int] = []
+        for cp, _, _ in self.run_both(["gh", "api", "user"], before_retry=lambda: seen.append(self.calls())):
+            self.assertEqual(cp.returncode, 0)
+        self.assertEqual(seen, [1, 2, 1, 2])
+
+    def test_timeout_is_retried(self) -> None:
+        self.gh_plan({"sleep": 30}, {"out": "ok\n"})
+        for cp, calls, _ in self.run_both(["gh", "api", "user"]):
+            self.assertEqual(cp.returncode, 0)
+            self.assertEqual(calls, 2)
+
+    def test_timeout_kills_grandchildren(self) -> None:
+        marker = self.tmp / "grandchild.log"
+        self.gh_plan({"grandchild": str(marker), "sleep": 30})
+        for cp, calls, elapsed in self.run_both(["gh", "repo", "clone", "o/r", "dest"], check=False):
+            self.assertEqual(cp.returncode, TIMEOUT_RETURNCODE)
+            self.assertEqual(calls, 3)
+            # Three 0.5s timeouts; a surviving grandchild would hold the pipe open far longer.
+            self.assertLess(elapsed, 5)
+            # Nothing from the killed attempts is still writing.
+            before = marker.read_text(encoding="utf-8")
+            time.sleep(0.3)
+            self.assertEqual(marker.read_text(encoding="utf-8"), before)
+
+    def test_create_is_not_retried(self) -> None:
+        self.gh_plan({"err": "HTTP 502: Bad Gateway\n", "exit": 1})
+        self.assertEqual(command_class(["gh", "release", "create", "v1"]), "gh-create")
+        cp = run(["gh", "release", "create", "v1", "-R", "o/r"], check=False)
+        self.assertEqual(cp.returncode, 1)
+        self.assertEqual(self.calls(), 1)
+
+
+class ConfigurePoliciesTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        configure_policies(None)
+
+    def test_rejects_bad_retry_on(self) -> None:
+        for value in ("abc", ["ok", 1], {"HTTP 5..": True}, ["("]):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                configure_policies({"gh": {"retry_on": value}})
+
+    def test_rejects_unknown_class_and_field(self) -> None:
+        with self.assertRaises(ValueError):
+            configure_policies({"svn": {}})
+        with self.assertRaises(ValueError):
+            configure_policies({"gh": {"retries": 3}})
+
+
+if __name__ == "__main__":
+    unittest.main()